@@ -0,0 +1,272 @@
+import collections
+import concurrent.futures
+import contextlib
+import heapq
+import io
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import typing as t
+import uuid
+
+from pydantic import BaseModel
+
+from llm_telemetry import percentile
+
+type Phase = t.Literal["start", "approve", "resume"]
+
+PHASES: tuple[Phase, ...] = ("start", "approve", "resume")
+
+
+class LoadConfig(BaseModel):
+    threads: int = 1_000
+    concurrency: int = 16
+    # New threads per second, with exponential gaps between arrivals. None starts them all at once.
+    arrival_rate: float | None = None
+    # Mean seconds, exponentially distributed, between a thread's interrupt and its approval.
+    think_time: float = 0.0
+    saver: t.Literal["memory", "sqlite"] = "memory"
+    db_path: str | None = None
+    # Shard threads across this many worker processes with graph_pool.GraphPool; 0 runs the graph here.
+    processes: int = 0
+    seed: int = 0
+    # Drop what the graph's nodes print while the load runs.
+    quiet: bool = True
+
+
+class PhaseStats(BaseModel):
+    phase: str
+    count: int
+    errors: int
+    # "ExceptionType: message" -> count, for the phase's failures.
+    error_messages: dict[str, int] = {}
+    throughput_per_second: float
+    p50_seconds: float
+    p95_seconds: float
+    p99_seconds: float
+    mean_service_seconds: float
+
+
+class LoadReport(BaseModel):
+    config: LoadConfig
+    wall_seconds: float
+    completed: int
+    failed: int
+    phases: list[PhaseStats]
+
+    def print(self) -> None:
+        print(
+            f"{self.config.threads} threads on {self.config.saver}, concurrency {self.config.concurrency}"
+            f"{f', {self.config.processes} processes' if self.config.processes else ''}: "
+            f"{self.completed} completed, {self.failed} failed in {self.wall_seconds:.2f}s "
+            f"({self.completed / self.wall_seconds:.1f} lifecycles/s)"
+        )
+        for stats in self.phases:
+            print(
+                f"  {stats.phase:>9}: {stats.throughput_per_second:8.1f}/s, p50 {stats.p50_seconds * 1e3:7.1f} ms, "
+                f"p95 {stats.p95_seconds * 1e3:7.1f} ms, p99 {stats.p99_seconds * 1e3:7.1f} ms, "
+                f"service {stats.mean_service_seconds * 1e3:6.1f} ms, {stats.errors} errors"
+            )
+            for message, count in sorted(stats.error_messages.items(), key=lambda item: item[1], reverse=True)[:5]:
+                print(f"             {count:6d} x {message}")
+
+
+class _QuietThreads(io.TextIOBase):
+    """
+    Stands in for sys.stdout during a run: drops what threads named with `prefix` print and passes
+    everything else through to `stream`.
+    """
+
+    def __init__(self, stream: t.TextIO, prefix: str):
+        self.stream = stream
+        self.prefix = prefix
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if threading.current_thread().name.startswith(self.prefix):
+            return len(text)
+        return self.stream.write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+def make_checkpointer(config: LoadConfig, directory: str) -> t.Any:
+    if config.saver == "memory":
+        from langgraph.checkpoint.memory import InMemorySaver
+
+        return InMemorySaver()
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    conn = sqlite3.connect(config.db_path or f"{directory}/load.db", check_same_thread=False)
+    return SqliteSaver(conn)
+
+
+def start(app: t.Any, thread_id: str) -> None:
+    from langgraph_interrupt_test import OuterGraphState
+
+    result = app.invoke(OuterGraphState(prompt="Please perform a sensitive_action now."), {"configurable": {"thread_id": thread_id}})
+    if "__interrupt__" not in result:
+        raise RuntimeError(f"{thread_id} finished without asking for approval")
+
+
+def approve(app: t.Any, thread_id: str) -> None:
+    """
+    Approves through the interrupted subgraph's state, as in test_langgraph_with_interrupt_in_subgraph.
+    """
+    from langgraph_interrupt_test import SubgraphState
+
+    config = {"configurable": {"thread_id": thread_id}}
+    state = app.get_state(config, subgraphs=True)
+    task = next((task for task in state.tasks if task.interrupts), None)
+    if task is None:
+        raise RuntimeError(f"{thread_id} has no interrupted task")
+    subgraph_state = SubgraphState.model_validate(task.state.values)
+    subgraph_state.outer_graph_state.approved = True
+    app.update_state({"configurable": {"thread_id": thread_id, "checkpoint_ns": task.name}}, subgraph_state)
+
+
+def resume(app: t.Any, thread_id: str) -> None:
+    result = app.invoke(None, {"configurable": {"thread_id": thread_id}})
+    if "__interrupt__" in result:
+        raise RuntimeError(f"{thread_id} was interrupted again after approval")
+
+
+STEPS: dict[Phase, t.Callable[[t.Any, str], None]] = {"start": start, "approve": approve, "resume": resume}
+
+
+def run_load(config: LoadConfig) -> LoadReport:
+    """
+    Drives `config.threads` threads of setup_workflow_with_subgraph through start, interrupt,
+    approval and resume on one compiled graph, with at most `config.concurrency` phases running at
+    once. A phase's latency runs from when it became due (arrival, end of think time, or end of
+    the previous phase) to when it finished, so it includes waiting for a worker; its service
+    time does not.
+    """
+    from langgraph_interrupt_test import setup_workflow_with_subgraph
+
+    rng = random.Random(config.seed)
+    latencies: dict[str, list[float]] = {phase: [] for phase in (*PHASES, "lifecycle")}
+    service: dict[str, list[float]] = {phase: [] for phase in PHASES}
+    errors: dict[str, collections.Counter[str]] = {phase: collections.Counter() for phase in PHASES}
+    arrived: dict[str, float] = {}
+    # (due, sequence, phase, thread_id); the sequence keeps equal due times in order.
+    due: list[tuple[float, int, Phase, str]] = []
+    outstanding = config.threads
+    condition = threading.Condition()
+
+    thread_name_prefix = "approval-load"
+    with tempfile.TemporaryDirectory() as directory, contextlib.ExitStack() as stack:
+        if config.quiet:
+            stack.enter_context(contextlib.redirect_stdout(_QuietThreads(sys.stdout, thread_name_prefix)))
+        if config.processes:
+            from graph_pool import GraphPool
+
+            # With --db-path, the directory for the shards' databases.
+            app = stack.enter_context(GraphPool(processes=config.processes, saver=config.saver, directory=config.db_path or directory, quiet=config.quiet))
+        else:
+            app = setup_workflow_with_subgraph(make_checkpointer(config, directory))
+        started = time.perf_counter()
+        arrival = started
+        # Fresh thread ids, so that a reused --db-path does not resume threads from an earlier run.
+        run_id = uuid.uuid4().hex[:8]
+        for i in range(config.threads):
+            if config.arrival_rate:
+                arrival += rng.expovariate(config.arrival_rate)
+            thread_id = f"load_{run_id}_{i}"
+            heapq.heappush(due, (arrival, i, "start", thread_id))
+            arrived[thread_id] = arrival
+        sequence = config.threads
+
+        def run_phase(phase: Phase, thread_id: str, due_at: float) -> None:
+            nonlocal outstanding, sequence
+            began = time.perf_counter()
+            try:
+                STEPS[phase](app, thread_id)
+                error = None
+            except Exception as e:
+                error = f"{type(e).__name__}: {str(e)[:200]}"
+            finished = time.perf_counter()
+            with condition:
+                service[phase].append(finished - began)
+                latencies[phase].append(finished - due_at)
+                if error is not None:
+                    errors[phase][error] += 1
+                    outstanding -= 1
+                elif phase == "resume":
+                    latencies["lifecycle"].append(finished - arrived[thread_id])
+                    outstanding -= 1
+                else:
+                    next_phase: Phase = "approve" if phase == "start" else "resume"
+                    think = rng.expovariate(1 / config.think_time) if phase == "start" and config.think_time else 0.0
+                    heapq.heappush(due, (finished + think, sequence, next_phase, thread_id))
+                    sequence += 1
+                condition.notify()
+
+        with concurrent.futures.ThreadPoolExecutor(config.concurrency, thread_name_prefix=thread_name_prefix) as executor:
+            with condition:
+                while outstanding:
+                    now = time.perf_counter()
+                    while due and due[0][0] <= now:
+                        due_at, _, phase, thread_id = heapq.heappop(due)
+                        executor.submit(run_phase, phase, thread_id, due_at)
+                    condition.wait(timeout=due[0][0] - now if due else None)
+        wall_seconds = time.perf_counter() - started
+
+    mean_service = {phase: sum(values) / len(values) if values else 0.0 for phase, values in service.items()}
+    # A whole lifecycle's work, without the think time and queueing.
+    mean_service["lifecycle"] = sum(mean_service.values())
+    phases = []
+    for phase, values in latencies.items():
+        values.sort()
+        phases.append(PhaseStats(
+            phase=phase,
+            count=len(values),
+            errors=errors[phase].total() if phase in errors else 0,
+            error_messages=dict(errors.get(phase, {})),
+            throughput_per_second=len(values) / wall_seconds,
+            p50_seconds=percentile(values, 50),
+            p95_seconds=percentile(values, 95),
+            p99_seconds=percentile(values, 99),
+            mean_service_seconds=mean_service[phase],
+        ))
+    completed = len(latencies["lifecycle"])
+    return LoadReport(config=config, wall_seconds=wall_seconds, completed=completed, failed=config.threads - completed, phases=phases)
+
+
+if __name__ == "__main__":
+    import argparse
+    import pathlib
+
+    parser = argparse.ArgumentParser(description="Load-test the interrupt/approve/resume lifecycle of setup_workflow_with_subgraph")
+    parser.add_argument("--threads", type=int, default=1_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--arrival-rate", type=float, help="New threads per second; all at once by default")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean seconds between interrupt and approval")
+    parser.add_argument("--saver", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--db-path", help="SQLite database to use instead of a temporary one; with --processes, a directory for one database per shard")
+    parser.add_argument("--processes", type=int, default=0, help="Shard threads across this many worker processes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="Show what the graph's nodes print")
+    parser.add_argument("--output", type=pathlib.Path, help="Write the report to this JSON file")
+    args = parser.parse_args()
+
+    report = run_load(LoadConfig(
+        threads=args.threads,
+        concurrency=args.concurrency,
+        arrival_rate=args.arrival_rate,
+        think_time=args.think_time,
+        saver=args.saver,
+        db_path=args.db_path,
+        processes=args.processes,
+        seed=args.seed,
+        quiet=not args.verbose,
+    ))
+    report.print()
+    if args.output:
+        args.output.write_text(report.model_dump_json(indent=2))
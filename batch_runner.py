@@ -0,0 +1,180 @@
+import asyncio
+import os
+import time
+import typing as t
+
+from pydantic import BaseModel, ValidationError
+
+
+class BatchRecord(BaseModel):
+    record_id: str
+    text: str
+    # Set for input lines that could not be read; the record is written out as failed.
+    error: str | None = None
+
+
+class BatchResult(BaseModel):
+    record_id: str
+    result: dict[str, t.Any] | None = None
+    error: str | None = None
+    elapsed_seconds: float
+
+
+class BatchSummary(BaseModel):
+    completed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def records_per_second(self) -> float:
+        return (self.completed + self.failed) / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+class AsyncRateLimiter:
+    """
+    Token bucket shared by every task in a batch: at most `rate` acquisitions per second,
+    with bursts of up to `burst`. Waiters are served in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def read_records(path: str) -> t.Iterator[BatchRecord]:
+    """
+    Reads records lazily from a file. Lines that are JSON objects are parsed as BatchRecords,
+    anything else is treated as raw text and identified by its line number. A JSON line that is
+    not a valid BatchRecord becomes a record with `error` set, so it fails alone.
+    """
+    with open(path, "r") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                try:
+                    yield BatchRecord.model_validate_json(line)
+                except ValidationError as e:
+                    yield BatchRecord(record_id=f"line-{line_number}", text=line, error=f"Invalid record on line {line_number}: {e}")
+            else:
+                yield BatchRecord(record_id=f"line-{line_number}", text=line)
+
+
+def finished_record_ids(output_path: str) -> set[str]:
+    """
+    The output file doubles as the checkpoint: records that already have a successful result are finished.
+    Failed records are retried on the next run.
+    """
+    if not os.path.exists(output_path):
+        return set()
+    finished = set()
+    with open(output_path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                result = BatchResult.model_validate_json(line)
+            except ValueError:
+                # A torn last line from a crashed run.
+                continue
+            if result.error is None:
+                finished.add(result.record_id)
+    return finished
+
+
+async def run_batch(
+    records: t.Iterable[BatchRecord],
+    fill_form: t.Callable[[str], t.Awaitable[BaseModel]],
+    output_path: str,
+    concurrency: int = 8,
+    rate_limiter: AsyncRateLimiter | None = None,
+) -> BatchSummary:
+    """
+    Runs `fill_form` over every record with at most `concurrency` calls in flight, appending each
+    result to `output_path` as soon as it completes. Records are pulled from `records` lazily, so
+    the input can be much larger than memory. Re-running with the same output file skips records
+    that already succeeded.
+    """
+    summary = BatchSummary()
+    finished = finished_record_ids(output_path)
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+
+    with open(output_path, "a") as output:
+        async def process(record: BatchRecord) -> None:
+            try:
+                if rate_limiter is not None:
+                    await rate_limiter.acquire()
+                call_started = time.perf_counter()
+                try:
+                    if record.error is not None:
+                        raise ValueError(record.error)
+                    form = await fill_form(record.text)
+                    result = BatchResult(
+                        record_id=record.record_id,
+                        result=form.model_dump(mode="json"),
+                        elapsed_seconds=time.perf_counter() - call_started,
+                    )
+                    summary.completed += 1
+                except Exception as e:
+                    result = BatchResult(
+                        record_id=record.record_id,
+                        error=f"{type(e).__name__}: {e}",
+                        elapsed_seconds=time.perf_counter() - call_started,
+                    )
+                    summary.failed += 1
+                # Writes happen on the event loop thread, so lines never interleave.
+                output.write(result.model_dump_json() + "\n")
+                output.flush()
+            finally:
+                semaphore.release()
+
+        async with asyncio.TaskGroup() as group:
+            for record in records:
+                if record.record_id in finished:
+                    summary.skipped += 1
+                    continue
+                await semaphore.acquire()
+                group.create_task(process(record))
+
+    summary.elapsed_seconds = time.perf_counter() - started
+    return summary
+
+
+if __name__ == "__main__":
+    import argparse
+    import dotenv
+
+    dotenv.load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Fill out FormResults for a file of unstructured records.")
+    parser.add_argument("input", help="Input file: one record per line, raw text or {\"record_id\": ..., \"text\": ...}")
+    parser.add_argument("output", help="Output JSONL file, also used as the checkpoint")
+    parser.add_argument("--backend", choices=["instructor", "openai"], default="instructor")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=None, help="Maximum requests per second")
+    parser.add_argument("--burst", type=int, default=1)
+    args = parser.parse_args()
+
+    from pydantic_test import fill_form_with_instructor, fill_form_with_openai_agent
+
+    fill_form = fill_form_with_instructor if args.backend == "instructor" else fill_form_with_openai_agent
+    rate_limiter = AsyncRateLimiter(args.rate, args.burst) if args.rate else None
+    summary = asyncio.run(run_batch(read_records(args.input), fill_form, args.output, args.concurrency, rate_limiter))
+    print(f"{summary} ({summary.records_per_second:.2f} records/s)")
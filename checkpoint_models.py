@@ -0,0 +1,146 @@
+import functools
+import importlib
+import json
+import typing as t
+
+from langgraph.checkpoint.base import JsonPlusSerializer
+from pydantic import BaseModel
+
+PYDANTIC_JSON = "pydantic_json:"
+
+
+def model_key(model_cls: type[BaseModel]) -> str:
+    return f"{model_cls.__module__}:{model_cls.__qualname__}"
+
+
+def import_model(key: str) -> type[BaseModel]:
+    """
+    The model a `model_key` names, imported the way JsonPlusSerializer imports the classes it revives.
+    """
+    module_name, _, qualname = key.partition(":")
+    try:
+        obj: t.Any = importlib.import_module(module_name)
+        obj = functools.reduce(getattr, qualname.split("."), obj)
+    except (ImportError, AttributeError) as e:
+        raise ValueError(f"Cannot load checkpointed model {key}: {e}") from e
+    if not (isinstance(obj, type) and issubclass(obj, BaseModel)):
+        raise ValueError(f"Cannot load checkpointed model {key}: {obj!r} is not a Pydantic model")
+    return obj
+
+
+class ModelSerializer(JsonPlusSerializer):
+    """
+    A JsonPlusSerializer that stores channel values of known Pydantic models as their JSON, tagged
+    with the model, and loads them back with `model_validate_json`. The bytes are parsed and
+    validated in one pass inside pydantic-core, so none of the intermediate dicts and lists that the
+    msgpack path unpacks (and then feeds to `cls(**kwargs)`) are ever created.
+
+    Models are known once registered, either up front or by being written through this serializer
+    in the same process. Checkpoint bytes name the model to load, so nothing else is imported on
+    their say-so unless its module is in `allowed_modules` (a module name also allows the modules
+    under it); a tagged value whose model is neither known nor allowed is loaded as a plain dict,
+    as JsonPlusSerializer does with a model it cannot find. Everything that is not a model,
+    and every checkpoint written by a plain JsonPlusSerializer, goes through the usual msgpack path.
+    A plain JsonPlusSerializer cannot read the tagged values, so switch readers before writers.
+    """
+
+    def __init__(self, *models: type[BaseModel], allowed_modules: t.Iterable[str] = (), **kwargs: t.Any):
+        super().__init__(**kwargs)
+        self._models: dict[str, type[BaseModel]] = {}
+        self.allowed_modules = frozenset(allowed_modules)
+        for model_cls in models:
+            self.register(model_cls)
+
+    def register[M: type[BaseModel]](self, model_cls: M) -> M:
+        self._models[model_key(model_cls)] = model_cls
+        return model_cls
+
+    def dumps_typed(self, obj: t.Any) -> tuple[str, bytes]:
+        if isinstance(obj, BaseModel):
+            model_cls = type(obj)
+            key = model_key(model_cls)
+            # Classes defined inside functions have no importable name but are still fine to
+            # round-trip within the process that registered them.
+            self._models.setdefault(key, model_cls)
+            return PYDANTIC_JSON + key, model_cls.__pydantic_serializer__.to_json(obj, round_trip=True)
+        return super().dumps_typed(obj)
+
+    def _allows(self, key: str) -> bool:
+        module_name = key.partition(":")[0]
+        return any(module_name == allowed or module_name.startswith(allowed + ".") for allowed in self.allowed_modules)
+
+    def loads_typed(self, data: tuple[str, bytes]) -> t.Any:
+        type_, data_ = data
+        if type_.startswith(PYDANTIC_JSON):
+            key = type_[len(PYDANTIC_JSON):]
+            model_cls = self._models.get(key)
+            if model_cls is None:
+                if not self._allows(key):
+                    return json.loads(data_)
+                model_cls = self._models[key] = import_model(key)
+            return model_cls.model_validate_json(data_)
+        return super().loads_typed(data)
+
+
+if __name__ == "__main__":
+    import timeit
+    import tracemalloc
+
+    from langgraph_interrupt_test import GraphState, OuterGraphState, SubgraphState
+
+    class Transcript(BaseModel):
+        thread: SubgraphState
+        steps: list[GraphState]
+        notes: dict[str, list[str]]
+
+    transcript = Transcript(
+        thread=SubgraphState(outer_graph_state=OuterGraphState(prompt="Please perform a sensitive_action now."), times_pre_step_was_run=1),
+        steps=[GraphState(query=f"step {i}: this is a sensitive_action", approved=i % 3 == 0) for i in range(1_000)],
+        notes={f"node_{i}": [f"note {j}" for j in range(10)] for i in range(50)},
+    )
+    plain = JsonPlusSerializer()
+    direct = ModelSerializer(Transcript)
+    msgpack_blob = plain.dumps_typed(transcript)
+    json_blob = direct.dumps_typed(transcript)
+    assert plain.loads_typed(msgpack_blob) == direct.loads_typed(json_blob) == transcript
+    assert direct.loads_typed(msgpack_blob) == transcript
+    # A fresh process on a persistent saver knows no models yet. Allowed modules are imported;
+    # anything else stays a dict rather than importing whatever module the bytes name.
+    graph_state_blob = direct.dumps_typed(GraphState(query="q"))
+    assert ModelSerializer(allowed_modules=["langgraph_interrupt_test"]).loads_typed(graph_state_blob) == GraphState(query="q")
+    assert ModelSerializer().loads_typed(graph_state_blob) == {"query": "q", "approved": False}
+    def local_model() -> type[BaseModel]:
+        class Local(BaseModel):
+            value: int
+
+        return Local
+
+    local_blob = direct.dumps_typed(local_model()(value=1))
+    try:
+        ModelSerializer(allowed_modules=["__main__"]).loads_typed(local_blob)
+    except ValueError as e:
+        print(e)
+    else:
+        raise AssertionError("a model that cannot be imported should not load")
+    print(f"{msgpack_blob[0]} {len(msgpack_blob[1])} bytes, {json_blob[0]} {len(json_blob[1])} bytes")
+
+    def peak_bytes(load: t.Callable[[], t.Any]) -> int:
+        tracemalloc.start()
+        load()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak
+
+    # The legacy "json" blobs are revived into dicts first and validated afterwards.
+    legacy_blob = ("json", transcript.model_dump_json().encode())
+    paths = {
+        "msgpack + cls(**kwargs)": lambda: plain.loads_typed(msgpack_blob),
+        "json reviver + model_validate": lambda: Transcript.model_validate(plain.loads_typed(legacy_blob)),
+        "model_validate_json": lambda: direct.loads_typed(json_blob),
+    }
+    baseline = None
+    for name, load in paths.items():
+        seconds = min(timeit.repeat(load, number=100, repeat=5)) / 100
+        peak = peak_bytes(load)
+        baseline = baseline or (seconds, peak)
+        print(f"{name}: {seconds * 1e6:.0f} us ({baseline[0] / seconds:.2f}x), peak {peak / 1024:.0f} KiB ({peak / baseline[1]:.0%})")
@@ -0,0 +1,135 @@
+import json
+import sqlite3
+import threading
+import time
+import typing as t
+
+
+class ConversationStore:
+    """
+    Append-only message log for many conversations, keyed by thread_id, in a single SQLite file.
+
+    Each message is stored as its own row, so a turn only writes the messages it added instead of
+    rewriting the whole history. History is decoded lazily, one row at a time, when it is iterated.
+    """
+
+    def __init__(self, db_path: str = "./conversations.db"):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS threads (
+                    thread_id TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    message_count INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS threads_by_namespace ON threads (namespace, updated_at);
+                CREATE TABLE IF NOT EXISTS messages (
+                    thread_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    PRIMARY KEY (thread_id, seq)
+                );
+                """
+            )
+
+    def append(self, thread_id: str, messages: t.Iterable[dict[str, t.Any]], namespace: str = "default") -> int:
+        """
+        Appends messages to the end of a thread, creating the thread if needed.
+        Returns the thread's new message count.
+        """
+        payloads = [json.dumps(message) for message in messages]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT message_count FROM threads WHERE thread_id = ?", (thread_id,)
+                ).fetchone()
+                start = row[0] if row else 0
+                self._conn.executemany(
+                    "INSERT INTO messages (thread_id, seq, payload) VALUES (?, ?, ?)",
+                    [(thread_id, start + i, payload) for i, payload in enumerate(payloads)],
+                )
+                self._conn.execute(
+                    """
+                    INSERT INTO threads (thread_id, namespace, message_count, updated_at) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (thread_id) DO UPDATE SET
+                        message_count = excluded.message_count,
+                        updated_at = excluded.updated_at
+                    """,
+                    (thread_id, namespace, start + len(payloads), time.time()),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return start + len(payloads)
+
+    def iter_messages(self, thread_id: str, start: int = 0, batch_size: int = 256) -> t.Iterator[dict[str, t.Any]]:
+        """
+        Lazily yields a thread's messages in order, starting at message index `start`.
+
+        Rows are read `batch_size` at a time, each batch in its own query, so the connection lock
+        is not held while the caller consumes messages.
+        """
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT seq, payload FROM messages WHERE thread_id = ? AND seq >= ? ORDER BY seq LIMIT ?",
+                    (thread_id, start, batch_size),
+                ).fetchall()
+            for seq, payload in rows:
+                yield json.loads(payload)
+                start = seq + 1
+            if len(rows) < batch_size:
+                return
+
+    def load(self, thread_id: str) -> list[dict[str, t.Any]]:
+        return list(self.iter_messages(thread_id))
+
+    def message_count(self, thread_id: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT message_count FROM threads WHERE thread_id = ?", (thread_id,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def exists(self, thread_id: str) -> bool:
+        return self.message_count(thread_id) > 0
+
+    def latest_thread_id(self, namespace: str = "default") -> str | None:
+        """
+        Returns the most recently updated thread in a namespace, or None if there are none.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT thread_id FROM threads WHERE namespace = ? ORDER BY updated_at DESC LIMIT 1",
+                (namespace,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == "__main__":
+    import tempfile
+    import os
+
+    db_path = os.path.join(tempfile.mkdtemp(), "conversations.db")
+    store = ConversationStore(db_path)
+
+    store.append("thread_a", [{"role": "user", "content": "My name is bob smith"}], namespace="demo")
+    store.append("thread_b", [{"role": "user", "content": "Hello"}], namespace="demo")
+    store.append("thread_a", [{"role": "assistant", "content": "Did you mean Bob Smith?"}], namespace="demo")
+
+    print(f"Latest thread: {store.latest_thread_id('demo')}")
+    print(f"thread_a has {store.message_count('thread_a')} messages")
+    for message in store.iter_messages("thread_a"):
+        print(message)
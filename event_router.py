@@ -0,0 +1,266 @@
+import threading
+import time
+import typing as t
+
+from pydantic import BaseModel
+
+type Path = tuple[str, ...]
+
+_MISSING = object()
+
+
+def _path(path: str | Path) -> Path:
+    return tuple(path.split(".")) if isinstance(path, str) else path
+
+
+def _getter(path: Path) -> t.Callable[[t.Any], t.Any]:
+    if len(path) == 1:
+        key = path[0]
+        return lambda payload: payload.get(key, _MISSING) if isinstance(payload, dict) else _MISSING
+
+    def get(payload: t.Any) -> t.Any:
+        for key in path:
+            if not isinstance(payload, dict):
+                return _MISSING
+            payload = payload.get(key, _MISSING)
+        return payload
+    return get
+
+
+class Route:
+    def __init__(
+        self,
+        name: str,
+        rules: dict[Path, t.Hashable],
+        handler: t.Callable[[t.Any], t.Any],
+        predicate: t.Callable[[t.Any], bool] | None,
+        priority: int,
+    ):
+        self.name = name
+        self.rules = rules
+        self.handler = handler
+        self.predicate = predicate
+        self.priority = priority
+
+    def __repr__(self) -> str:
+        rules = ", ".join(f"{'.'.join(path)}={value!r}" for path, value in self.rules.items())
+        return f"Route({self.name!r}, {rules}{', predicate' if self.predicate else ''})"
+
+
+class _Node:
+    """
+    One level of the trie: either a dispatch on the value at `path`, or a leaf holding the routes
+    whose rules are all satisfied, in priority order.
+    """
+    __slots__ = ("path", "get", "branches", "default", "candidates")
+
+    def __init__(self):
+        self.path: Path | None = None
+        self.get: t.Callable[[t.Any], t.Any] | None = None
+        self.branches: dict[t.Hashable, _Node] = {}
+        self.default: _Node | None = None
+        self.candidates: list[Route] = []
+
+
+def _build(routes: list[Route], decided: frozenset[Path]) -> _Node:
+    node = _Node()
+    usage: dict[Path, int] = {}
+    for route in routes:
+        for path in route.rules:
+            if path not in decided:
+                usage[path] = usage.get(path, 0) + 1
+    if not usage:
+        node.candidates = sorted(routes, key=lambda route: route.priority)
+        return node
+
+    # Dispatch first on the field most routes care about, e.g. the top-level `type`.
+    path = max(usage, key=lambda path: (usage[path], -len(path)))
+    node.path, node.get = path, _getter(path)
+    unconstrained = [route for route in routes if path not in route.rules]
+    by_value: dict[t.Hashable, list[Route]] = {}
+    for route in routes:
+        if path in route.rules:
+            by_value.setdefault(route.rules[path], []).append(route)
+    decided = decided | {path}
+    # Routes that do not look at this field can match under every value, so they go in every branch.
+    node.branches = {value: _build(matching + unconstrained, decided) for value, matching in by_value.items()}
+    node.default = _build(unconstrained, decided)
+    return node
+
+
+class RouteStats(BaseModel):
+    count: int = 0
+    handler_seconds: float = 0.0
+    max_handler_seconds: float = 0.0
+
+
+class EventRouter:
+    """
+    Dispatches dict payloads (e.g. Slack event callbacks) to handlers by declarative rules.
+
+    Each route is a set of (path, value) equality rules, such as
+    `{"type": "event_callback", "event.type": "message"}`, plus an optional predicate for anything
+    equality cannot express, which may use structural pattern matching. The rules are compiled into
+    a trie of dict lookups keyed on the discriminator fields, so routing costs a few lookups however
+    many routes there are. Only the predicates of routes that survive the trie are evaluated. As
+    with `case` clauses, the first registered matching route wins.
+    """
+
+    def __init__(self, fallback: t.Callable[[t.Any], t.Any] | None = None):
+        self.routes: list[Route] = []
+        self.fallback = fallback
+        self.stats: dict[str, RouteStats] = {}
+        self.unmatched = 0
+        self.routing_seconds = 0.0
+        self._root: _Node | None = None
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        name: str,
+        rules: dict[str | Path, t.Hashable],
+        handler: t.Callable[[t.Any], t.Any],
+        predicate: t.Callable[[t.Any], bool] | None = None,
+    ) -> Route:
+        with self._lock:
+            if name in self.stats:
+                raise ValueError(f"A route named {name!r} is already registered")
+            route = Route(name, {_path(path): value for path, value in rules.items()}, handler, predicate, len(self.routes))
+            self.routes.append(route)
+            self.stats[name] = RouteStats()
+            self._root = None
+        return route
+
+    def route(
+        self,
+        name: str,
+        rules: dict[str | Path, t.Hashable],
+        predicate: t.Callable[[t.Any], bool] | None = None,
+    ) -> t.Callable[[t.Callable[[t.Any], t.Any]], t.Callable[[t.Any], t.Any]]:
+        def decorator(handler: t.Callable[[t.Any], t.Any]) -> t.Callable[[t.Any], t.Any]:
+            self.add(name, rules, handler, predicate)
+            return handler
+        return decorator
+
+    def _compiled(self) -> _Node:
+        root = self._root
+        if root is None:
+            with self._lock:
+                root = self._root
+                if root is None:
+                    root = self._root = _build(self.routes, frozenset())
+        return root
+
+    def resolve(self, payload: t.Any) -> Route | None:
+        """
+        The route a payload would be dispatched to, without calling its handler.
+        """
+        node = self._compiled()
+        while node.get is not None:
+            value = node.get(payload)
+            try:
+                node = node.branches.get(value) or node.default  # type: ignore[assignment]
+            except TypeError:
+                # Unhashable values (lists, dicts) cannot equal a rule value.
+                node = node.default  # type: ignore[assignment]
+        for route in node.candidates:
+            if route.predicate is None or route.predicate(payload):
+                return route
+        return None
+
+    def dispatch(self, payload: t.Any) -> t.Any:
+        started = time.perf_counter()
+        route = self.resolve(payload)
+        routed = time.perf_counter()
+        # Handlers run outside the lock; only the counters are shared between dispatching threads.
+        with self._lock:
+            self.routing_seconds += routed - started
+            if route is None:
+                self.unmatched += 1
+        if route is None:
+            return None if self.fallback is None else self.fallback(payload)
+        result = route.handler(payload)
+        elapsed = time.perf_counter() - routed
+        with self._lock:
+            stats = self.stats[route.name]
+            stats.count += 1
+            stats.handler_seconds += elapsed
+            stats.max_handler_seconds = max(stats.max_handler_seconds, elapsed)
+        return result
+
+    def dispatch_many(self, payloads: t.Iterable[t.Any]) -> list[t.Any]:
+        return [self.dispatch(payload) for payload in payloads]
+
+    def print_stats(self) -> None:
+        routed = sum(stats.count for stats in self.stats.values()) + self.unmatched
+        per_event = self.routing_seconds / routed * 1e6 if routed else 0.0
+        print(f"{routed} events, {self.unmatched} unmatched, routing {per_event:.2f} us/event")
+        for name, stats in sorted(self.stats.items(), key=lambda item: item[1].count, reverse=True):
+            if stats.count:
+                mean = stats.handler_seconds / stats.count * 1e6
+                print(f"  {name}: {stats.count} events, handler mean {mean:.1f} us, max {stats.max_handler_seconds * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    import random
+    import timeit
+
+    router = EventRouter(fallback=lambda payload: "No match")
+
+    # Something equality rules cannot express is left to pattern matching. Like a more specific
+    # `case`, it is registered before the general message route.
+    def is_thread_reply(payload) -> bool:
+        match payload:
+            case {"event": {"thread_ts": str(), "ts": str() as ts}} if ts != payload["event"]["thread_ts"]:
+                return True
+        return False
+
+    @router.route("thread_reply", {"type": "event_callback", "event.type": "message"}, predicate=is_thread_reply)
+    def on_thread_reply(payload):
+        return f"Thread reply: {payload['event']['text']}"
+
+    @router.route("message", {"type": "event_callback", "event.type": "message"})
+    def on_message(payload):
+        return f"Message event: {payload['event']}"
+
+    @router.route("url_verification", {"type": "url_verification"})
+    def on_url_verification(payload):
+        return payload["challenge"]
+
+    print(router.dispatch({"type": "event_callback", "event": {"type": "message", "text": "Hello"}}))
+    print(router.dispatch({"type": "url_verification", "challenge": "abc"}))
+    print(router.dispatch({"type": "event_callback", "event": {"type": "reaction_added"}}))
+    print(router.dispatch({"type": "event_callback", "event": {"type": "message", "text": "Hi", "ts": "2", "thread_ts": "1"}}))
+    router.print_stats()
+
+    # 60 event types against the equivalent chain of `case` clauses.
+    event_types = [f"event_{i}" for i in range(60)]
+    big_router = EventRouter()
+    cases = []
+    for i, event_type in enumerate(event_types):
+        big_router.add(event_type, {"type": "event_callback", "event.type": event_type}, lambda payload, i=i: i)
+        cases.append(f"        case {{'type': 'event_callback', 'event': {{'type': {event_type!r}}}}}:\n            return {i}")
+    namespace: dict[str, t.Any] = {}
+    exec("def match_chain(data):\n    match data:\n" + "\n".join(cases) + "\n        case _:\n            return None\n", namespace)
+    match_chain = namespace["match_chain"]
+
+    payloads = [{"type": "event_callback", "event": {"type": random.choice(event_types), "text": "hi"}} for _ in range(10_000)]
+    assert [match_chain(payload) for payload in payloads] == [big_router.resolve(payload).handler(payload) for payload in payloads]
+    chain_time = timeit.timeit(lambda: [match_chain(payload) for payload in payloads], number=5) / 5 / len(payloads)
+    trie_time = timeit.timeit(lambda: [big_router.resolve(payload) for payload in payloads], number=5) / 5 / len(payloads)
+    print(f"routing among 60 event types: match chain {chain_time * 1e6:.2f} us, trie {trie_time * 1e6:.2f} us ({chain_time / trie_time:.1f}x)")
+
+    try:
+        big_router.add("event_0", {"type": "event_callback"}, print)
+    except ValueError as e:
+        print(e)
+    else:
+        raise AssertionError("add should reject a duplicate route name")
+
+    # Dispatch from several threads at once; every event is counted exactly once.
+    import concurrent.futures
+
+    with concurrent.futures.ThreadPoolExecutor(8) as executor:
+        list(executor.map(big_router.dispatch, payloads))
+    assert sum(stats.count for stats in big_router.stats.values()) == len(payloads)
+    big_router.print_stats()
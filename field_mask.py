@@ -0,0 +1,248 @@
+import functools
+import types
+import typing as t
+
+from pydantic import BaseModel, PlainSerializer, TypeAdapter, WrapSerializer
+from pydantic_core import to_json
+from typing_extensions import TypedDict
+
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+
+type MaskTree = dict[str, "MaskTree | None"]
+
+
+def _mask_tree(paths: t.Iterable[str]) -> MaskTree:
+    """
+    Turns dotted paths into a nested dict. A path that names a field outright (None) wins over
+    deeper paths into the same field.
+    """
+    tree: MaskTree = {}
+    for path in paths:
+        node = tree
+        *parents, leaf = path.split(".")
+        for part in parents:
+            child = node.setdefault(part, {})
+            if child is None:
+                break
+            node = child
+        else:
+            node[leaf] = None
+    return tree
+
+
+def _is_plain(annotation: t.Any) -> bool:
+    """
+    True for annotations whose values are already JSON-compatible Python objects.
+    """
+    if annotation in _PLAIN_TYPES:
+        return True
+    origin = t.get_origin(annotation)
+    if origin is t.Literal:
+        return all(isinstance(arg, _PLAIN_TYPES) for arg in t.get_args(annotation))
+    if origin in (t.Union, types.UnionType):
+        return all(_is_plain(arg) for arg in t.get_args(annotation))
+    return False
+
+
+def _serialized_fields(model_cls: type[BaseModel]) -> set[str]:
+    """
+    Fields that have a `@field_serializer`. "*" stands for all of them.
+    """
+    return {name for decorator in model_cls.__pydantic_decorators__.field_serializers.values() for name in decorator.info.fields}
+
+
+def _dump_field(obj: BaseModel, name: str, key: str, mode: str) -> t.Any:
+    # The model's own serializer, which runs its @field_serializer for this field.
+    return obj.__pydantic_serializer__.to_python(obj, include={name}, mode=mode)[key]
+
+
+def _nested_model(annotation: t.Any) -> tuple[type[BaseModel], bool, bool] | None:
+    """
+    For a field that holds a model, returns (model class, is optional, is a list of models).
+    """
+    optional = False
+    origin = t.get_origin(annotation)
+    if origin in (t.Union, types.UnionType):
+        args = [arg for arg in t.get_args(annotation) if arg is not type(None)]
+        if len(args) != 1:
+            return None
+        optional = True
+        annotation = args[0]
+        origin = t.get_origin(annotation)
+    if origin in (list, tuple) and len(t.get_args(annotation)) >= 1:
+        item = t.get_args(annotation)[0]
+        if isinstance(item, type) and issubclass(item, BaseModel):
+            return item, optional, True
+        return None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, optional, False
+    return None
+
+
+def _compile(model_cls: type[BaseModel], tree: MaskTree, target: str, depth: int = 0) -> tuple[str, type, bool]:
+    """
+    Compiles the mask for one model into a Python expression that builds the masked dict from
+    `target`, the TypedDict describing that dict, and whether it is already plain JSON-compatible data.
+    """
+    unknown = tree.keys() - model_cls.model_fields.keys()
+    if unknown:
+        raise ValueError(f"{model_cls.__name__} has no field(s) {sorted(unknown)}")
+    if model_cls.__pydantic_decorators__.model_serializers:
+        raise ValueError(f"{model_cls.__name__} has a model_serializer, so it can only be projected whole")
+    serialized = _serialized_fields(model_cls)
+    by_alias = model_cls.model_config.get("serialize_by_alias", False)
+
+    items: list[str] = []
+    view_fields: dict[str, t.Any] = {}
+    plain = True
+    # Keys come out in the model's field order, whatever order the mask was written in.
+    for name, field in model_cls.model_fields.items():
+        if name not in tree:
+            continue
+        subtree = tree[name]
+        value = f"{target}.{name}"
+        key = (field.serialization_alias or field.alias or name) if by_alias else name
+        if subtree is None:
+            if name in serialized or "*" in serialized:
+                items.append(f"{key!r}: _dump_field({target}, {name!r}, {key!r}, mode)")
+                view_fields[key] = t.Any
+                plain = False
+                continue
+            items.append(f"{key!r}: {value}")
+            # Annotated metadata carries PlainSerializer, WrapSerializer and friends into the view.
+            view_fields[key] = t.Annotated[(field.annotation, *field.metadata)] if field.metadata else field.annotation
+            plain = plain and _is_plain(field.annotation) and not any(isinstance(item, (PlainSerializer, WrapSerializer)) for item in field.metadata)
+            continue
+
+        nested = _nested_model(field.annotation)
+        if nested is None:
+            raise ValueError(f"{model_cls.__name__}.{name} does not hold a model, so it cannot be masked further")
+        if name in serialized or "*" in serialized:
+            raise ValueError(f"{model_cls.__name__}.{name} has a field_serializer, so it can only be projected whole")
+        sub_cls, optional, is_list = nested
+        if is_list:
+            item = f"_item{depth}"
+            sub_expr, sub_view, sub_plain = _compile(sub_cls, subtree, item, depth + 1)
+            expr, view_fields[key] = f"[{sub_expr} for {item} in {value}]", list[sub_view]
+        else:
+            sub_expr, sub_view, sub_plain = _compile(sub_cls, subtree, value, depth + 1)
+            expr, view_fields[key] = sub_expr, sub_view
+        if optional:
+            expr, view_fields[key] = f"(None if {value} is None else {expr})", view_fields[key] | None
+        items.append(f"{key!r}: {expr}")
+        plain = plain and sub_plain
+
+    view = TypedDict(f"{model_cls.__name__}View", view_fields)  # type: ignore[operator]
+    return "{" + ", ".join(items) + "}", view, plain
+
+
+def _extractor(model_cls: type[BaseModel], tree: MaskTree) -> tuple[t.Callable[[BaseModel, str], dict], type, bool]:
+    # One generated function with straight-line attribute reads, instead of walking the mask per call.
+    expr, view, plain = _compile(model_cls, tree, "obj")
+    namespace: dict[str, t.Any] = {"_dump_field": _dump_field}
+    exec(f"def extract(obj, mode):\n    return {expr}\n", namespace)
+    return namespace["extract"], view, plain
+
+
+class Projection[M: BaseModel]:
+    """
+    A precompiled view of `model_cls` restricted to a set of dotted field paths.
+
+    Fields named in the mask are included even if they are declared with `Field(exclude=True)`;
+    a field named outright is dumped whole with its own serialization settings, including
+    `@field_serializer`s and serializers in its Annotated metadata. The mask is resolved once, into
+    a generated function that reads exactly the masked attributes and a serializer for the view,
+    so dumping does not re-interpret include/exclude dicts on every call. Keys are field names,
+    or serialization aliases for models with `serialize_by_alias`, as in `model_dump()`.
+    """
+
+    def __init__(self, model_cls: type[M], paths: frozenset[str]):
+        self.model_cls = model_cls
+        self.paths = paths
+        self._extract, self.view, self.plain = _extractor(model_cls, _mask_tree(paths))
+        self._adapter = TypeAdapter(self.view)
+
+    def dump(self, instance: M, mode: t.Literal["python", "json"] = "python") -> dict[str, t.Any]:
+        data = self._extract(instance, mode)
+        if self.plain:
+            return data
+        return self._adapter.dump_python(data, mode=mode)
+
+    def dump_json(self, instance: M) -> bytes:
+        data = self._extract(instance, "json")
+        if self.plain:
+            return to_json(data)
+        return self._adapter.dump_json(data)
+
+    def __repr__(self) -> str:
+        return f"Projection({self.model_cls.__name__}, {sorted(self.paths)})"
+
+
+@functools.cache
+def _projection(model_cls: type[BaseModel], paths: frozenset[str]) -> Projection:
+    return Projection(model_cls, paths)
+
+
+def projection[M: BaseModel](model_cls: type[M], *paths: str) -> Projection[M]:
+    """
+    Returns the cached Projection of `model_cls` onto `paths`, e.g.
+    `projection(User, "name", "address.city", "address.postal_code")`.
+    """
+    return _projection(model_cls, frozenset(paths))
+
+
+if __name__ == "__main__":
+    import timeit
+
+    from pydantic import Field, field_serializer
+
+    class Address(BaseModel):
+        street: str
+        city: str
+        postal_code: str = Field(exclude=True)
+
+    class User(BaseModel):
+        name: str
+        email: str
+        address: Address
+        previous_addresses: list[Address] = []
+
+    user = User(
+        name="John",
+        email="john@example.com",
+        address=Address(street="123 Main St", city="NYC", postal_code="10001"),
+        previous_addresses=[Address(street="1 Elm St", city="Boston", postal_code="02101")],
+    )
+
+    view = projection(User, "name", "address.city", "address.postal_code", "previous_addresses.city")
+    print(view, view.dump(user))
+    print(view.dump_json(user))
+    assert projection(User, "address.postal_code", "address.city", "previous_addresses.city", "name") is view
+    whole = projection(User, "name", "address")
+    print(whole, whole.dump(user), whole.dump_json(user))
+
+    include = {"name": True, "address": {"city": True, "postal_code": True}, "previous_addresses": {"__all__": {"city": True}}}
+    assert user.model_dump(include=include) == {**view.dump(user), "address": {"city": "NYC"}}  # Pydantic drops postal_code
+
+    class Login(BaseModel):
+        name: str
+        secret: t.Annotated[str, PlainSerializer(lambda value: "***")]
+
+        @field_serializer("name")
+        def upper_name(self, value: str) -> str:
+            return value.upper()
+
+    login = Login(name="john", secret="pw")
+    login_view = projection(Login, "name", "secret")
+    assert login_view.dump(login) == login.model_dump() == {"name": "JOHN", "secret": "***"}
+    assert login_view.dump_json(login) == login.model_dump_json().encode()
+
+    n = 100_000
+    for label, baseline, compiled in [
+        ("dump", lambda: user.model_dump(include=include), lambda: view.dump(user)),
+        ("dump_json", lambda: user.model_dump_json(include=include), lambda: view.dump_json(user)),
+        ("dump (whole field)", lambda: user.model_dump(include={"name": True, "address": True}), lambda: whole.dump(user)),
+    ]:
+        baseline_time = timeit.timeit(baseline, number=n) / n
+        compiled_time = timeit.timeit(compiled, number=n) / n
+        print(f"{label}: include dict {baseline_time * 1e6:.2f} us, projection {compiled_time * 1e6:.2f} us ({baseline_time / compiled_time:.1f}x)")
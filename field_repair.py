@@ -0,0 +1,143 @@
+import copy
+import threading
+import typing as t
+
+from pydantic import BaseModel, ValidationError, model_validator
+
+
+def strip(value: t.Any) -> t.Any:
+    return value.strip() if isinstance(value, str) else value
+
+
+def collapse_whitespace(value: t.Any) -> t.Any:
+    return " ".join(value.split()) if isinstance(value, str) else value
+
+
+def capitalize_words(value: t.Any) -> t.Any:
+    return " ".join(part.capitalize() for part in value.split(" ")) if isinstance(value, str) else value
+
+
+def lowercase(value: t.Any) -> t.Any:
+    return value.lower() if isinstance(value, str) else value
+
+
+class Repair:
+    """
+    Deterministic fixes for a field, attached with `Annotated[str, Repair(strip, capitalize_words)]`.
+
+    The rules only run after the field has failed validation, and are applied in order.
+    """
+
+    def __init__(self, *rules: t.Callable[[t.Any], t.Any]):
+        self.rules = rules
+
+    def apply(self, value: t.Any) -> t.Any:
+        for rule in self.rules:
+            value = rule(value)
+        return value
+
+    def __repr__(self) -> str:
+        return f"Repair({', '.join(rule.__name__ for rule in self.rules)})"
+
+
+class RepairStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.attempted = 0
+        self.repaired = 0
+
+    def record(self, repaired: bool) -> None:
+        with self._lock:
+            self.attempted += 1
+            if repaired:
+                self.repaired += 1
+
+    @property
+    def retries_avoided(self) -> int:
+        """
+        Every successful local repair is a validation error that would otherwise have gone back to the LLM.
+        """
+        return self.repaired
+
+    def __repr__(self) -> str:
+        return f"RepairStats(attempted={self.attempted}, repaired={self.repaired})"
+
+
+repair_stats = RepairStats()
+
+
+def field_repair(model_cls: type[BaseModel], field_name: str) -> Repair | None:
+    field = model_cls.model_fields.get(field_name)
+    if field is None:
+        return None
+    return next((m for m in field.metadata if isinstance(m, Repair)), None)
+
+
+def repair_data(model_cls: type[BaseModel], data: t.Any, error: ValidationError) -> dict[str, t.Any] | None:
+    """
+    Applies the repair rules of every failing field and returns the repaired copy of `data`,
+    or None if none of the failing fields could be changed.
+    """
+    if not isinstance(data, dict):
+        return None
+    repaired = copy.copy(data)
+    changed = False
+    for err in error.errors():
+        loc = err["loc"]
+        if not loc or not isinstance(loc[0], str) or loc[0] not in repaired:
+            continue
+        repair = field_repair(model_cls, loc[0])
+        if repair is None:
+            continue
+        new_value = repair.apply(repaired[loc[0]])
+        if new_value != repaired[loc[0]]:
+            repaired[loc[0]] = new_value
+            changed = True
+    return repaired if changed else None
+
+
+class RepairableModel(BaseModel):
+    """
+    Base model that runs its fields' Repair rules before letting a ValidationError escape.
+
+    This sits under every validation path (tool calls, instructor response models, nested fields),
+    so trivially fixable errors never cost an LLM round trip. If the repaired data still fails,
+    the original error is raised so the LLM is told about the value it actually produced.
+    """
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def _repair_before_failing(cls, data: t.Any, handler: t.Callable[[t.Any], t.Any]) -> t.Any:
+        try:
+            return handler(data)
+        except ValidationError as e:
+            repaired = repair_data(cls, data, e)
+            if repaired is None:
+                raise
+            try:
+                result = handler(repaired)
+            except ValidationError:
+                repair_stats.record(repaired=False)
+                raise e
+            repair_stats.record(repaired=True)
+            return result
+
+
+if __name__ == "__main__":
+    from pydantic import field_validator
+
+    class Person(RepairableModel):
+        name: t.Annotated[str, Repair(collapse_whitespace, capitalize_words)]
+
+        @field_validator("name")
+        def validate_name(cls, value: str) -> str:
+            if value != value.title():
+                raise ValueError(f"Names must be capitalized: {value}")
+            return value
+
+    print(Person.model_validate({"name": "  bob   smith "}))
+    try:
+        Person.model_validate({"name": 42})
+    except ValidationError as e:
+        print(f"Unrepairable as expected: {e.error_count()} error(s)")
+    print(repair_stats, f"retries avoided: {repair_stats.retries_avoided}")
@@ -0,0 +1,216 @@
+import concurrent.futures
+import contextvars
+import inspect
+import threading
+import time
+import typing as t
+
+from pydantic import BaseModel
+
+
+# Pydantic caches parametrized generics weakly; warmed classes must stay alive to stay warm.
+_warmed: set[type[BaseModel]] = set()
+
+
+class _Probe[T](BaseModel):
+    value: T
+
+
+class WarmupEntry(BaseModel):
+    target: str
+    models: list[str]
+    seconds: float
+
+
+class WarmupReport(BaseModel):
+    entries: list[WarmupEntry] = []
+    total_seconds: float = 0.0
+
+    def __str__(self) -> str:
+        models = sum(len(entry.models) for entry in self.entries)
+        lines = [f"Warmed {models} model(s) from {len(self.entries)} target(s) in {self.total_seconds * 1e3:.1f} ms"]
+        for entry in sorted(self.entries, key=lambda entry: entry.seconds, reverse=True):
+            lines.append(f"  {entry.target}: {entry.seconds * 1e3:.2f} ms ({', '.join(entry.models) or 'nothing new'})")
+        return "\n".join(lines)
+
+
+def _collect_models(annotation: t.Any, found: dict[type[BaseModel], None]) -> None:
+    """
+    Adds every concrete model reachable from `annotation`: the model itself, its generic
+    arguments and the models in its fields.
+    """
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        if annotation in found:
+            return
+        metadata = annotation.__pydantic_generic_metadata__
+        if not metadata["parameters"]:
+            # Unparametrized generics are templates; only their parametrizations get validated.
+            found[annotation] = None
+        for arg in metadata["args"]:
+            _collect_models(arg, found)
+        for field in annotation.model_fields.values():
+            _collect_models(field.annotation, found)
+        return
+    for arg in t.get_args(annotation):
+        _collect_models(arg, found)
+
+
+def _node_annotations(func: t.Callable[..., t.Any]) -> list[t.Any]:
+    """
+    The types a node declares. Nodes wrapped by `adapt_node_to_channel` only take a dict, so they
+    carry their Pydantic input and output types in `node_types`.
+    """
+    declared = getattr(func, "node_types", None)
+    if declared is not None:
+        return list(declared)
+    try:
+        return list(t.get_type_hints(inspect.unwrap(func)).values())
+    except (NameError, TypeError):
+        # Forward references to names that are not resolvable from the node's module.
+        return []
+
+
+def _graph_annotations(graph: t.Any) -> list[t.Any]:
+    builder = getattr(graph, "builder", graph)
+    annotations: list[t.Any] = list(getattr(builder, "schemas", {}).keys())
+    for spec in builder.nodes.values():
+        runnable = spec.runnable
+        if hasattr(runnable, "builder"):
+            annotations += _graph_annotations(runnable)
+            continue
+        annotations.append(spec.input_schema)
+        for func in (getattr(runnable, "func", None), getattr(runnable, "afunc", None)):
+            if func is not None:
+                annotations += _node_annotations(func)
+    return annotations
+
+
+def discover_models(*targets: t.Any, namespace: dict[str, t.Any] | None = None) -> list[type[BaseModel]]:
+    """
+    Finds the concrete models used by `targets`, which can be:
+      - a StateGraph or compiled graph (subgraphs included), read from its node type declarations
+      - a node function, read from its type hints
+      - a type or annotation such as `GenericClass[Bar]` or `list[Foo]`
+      - a string such as "Bar[Foo]", evaluated in `namespace`, so the parametrization itself is
+        deferred to warm-up
+    """
+    found: dict[type[BaseModel], None] = {}
+    for target in targets:
+        if isinstance(target, str):
+            target = eval(target, namespace or {})
+        if hasattr(target, "nodes") and (hasattr(target, "builder") or hasattr(target, "schemas")):
+            annotations = _graph_annotations(target)
+        elif callable(target) and not isinstance(target, type) and t.get_origin(target) is None:
+            annotations = _node_annotations(target)
+        else:
+            annotations = [target]
+        for annotation in annotations:
+            _collect_models(annotation, found)
+    return list(found)
+
+
+def _describe(target: t.Any) -> str:
+    if isinstance(target, str):
+        return target
+    if hasattr(target, "nodes"):
+        return f"graph {getattr(target, 'name', type(target).__name__)}"
+    return getattr(target, "__qualname__", None) or repr(target)
+
+
+def _warm_up(targets: tuple[t.Any, ...], namespace: dict[str, t.Any] | None, json_schema: bool) -> WarmupReport:
+    report = WarmupReport()
+    seen: set[type[BaseModel]] = set()
+    started = time.perf_counter()
+    for target in targets:
+        # Timed per target, since resolving string annotations is where new parametrizations get built.
+        target_started = time.perf_counter()
+        models = [model_cls for model_cls in discover_models(target, namespace=namespace) if model_cls not in seen]
+        for model_cls in models:
+            seen.add(model_cls)
+            _warmed.add(model_cls)
+            if not model_cls.__pydantic_complete__:
+                model_cls.model_rebuild()
+            if json_schema:
+                model_cls.model_json_schema()
+        report.entries.append(WarmupEntry(
+            target=_describe(target),
+            models=[model_cls.__name__ for model_cls in models],
+            seconds=time.perf_counter() - target_started,
+        ))
+    report.total_seconds = time.perf_counter() - started
+    return report
+
+
+@t.overload
+def warm_up(*targets: t.Any, namespace: dict[str, t.Any] | None = ..., json_schema: bool = ..., background: t.Literal[False] = ...) -> WarmupReport: ...
+@t.overload
+def warm_up(*targets: t.Any, namespace: dict[str, t.Any] | None = ..., json_schema: bool = ..., background: t.Literal[True]) -> concurrent.futures.Future[WarmupReport]: ...
+def warm_up(
+    *targets: t.Any,
+    namespace: dict[str, t.Any] | None = None,
+    json_schema: bool = False,
+    background: bool = False,
+) -> WarmupReport | concurrent.futures.Future[WarmupReport]:
+    """
+    Builds the classes and core schemas of every model used by `targets` (see `discover_models`)
+    so the first request does not pay for it. Parametrizing a generic creates a new class and
+    core schema the first time; afterwards Pydantic returns the cached class.
+
+    With `json_schema`, the JSON schemas used in prompts are generated too. With `background`, the
+    work runs on a daemon thread and a Future of the report is returned. Pydantic keeps its generic
+    class cache in a ContextVar, so the thread runs in a copy of the caller's context, which shares
+    the caller's cache.
+    """
+    if not background:
+        return _warm_up(targets, namespace, json_schema)
+
+    future: concurrent.futures.Future[WarmupReport] = concurrent.futures.Future()
+
+    def run() -> None:
+        try:
+            future.set_result(_warm_up(targets, namespace, json_schema))
+        except BaseException as e:
+            future.set_exception(e)
+
+    # Parametrizing any generic creates the cache in this context, if it does not exist yet, before
+    # the context is copied; otherwise the thread would fill a cache of its own.
+    _Probe[int]
+    threading.Thread(target=contextvars.copy_context().run, args=(run,), name="generic-warmup", daemon=True).start()
+    return future
+
+
+if __name__ == "__main__":
+    class Foo(BaseModel):
+        foo_field: str
+
+    class Bar[T: BaseModel](BaseModel):
+        bar_field: T
+
+    class Pair[A: BaseModel, B: BaseModel](BaseModel):
+        first: A
+        second: list[Bar[B]]
+
+    namespace = {"Foo": Foo, "Bar": Bar, "Pair": Pair}
+    specs = ["Bar[Foo]", "Pair[Foo, Bar[Foo]]", "Pair[Bar[Foo], Foo]"]
+
+    # The first use of each parametrization during a request, with nothing warmed.
+    for spec in specs:
+        started = time.perf_counter()
+        eval(spec, namespace)
+        print(f"cold {spec}: {(time.perf_counter() - started) * 1e3:.2f} ms")
+    started = time.perf_counter()
+    eval(specs[1], namespace)
+    print(f"warm {specs[1]}: {(time.perf_counter() - started) * 1e6:.1f} us")
+
+    class Baz(BaseModel):
+        baz_field: str
+
+    # String annotations (or `from __future__ import annotations`) leave parametrizing to warm-up.
+    def node(state: "Pair[Baz, Baz]") -> "Bar[Pair[Baz, Foo]]":
+        ...
+
+    future = warm_up(node, "Bar[Baz]", namespace={**namespace, "Baz": Baz}, background=True)
+    print(future.result())
+    started = time.perf_counter()
+    t.get_type_hints(node)
+    print(f"first request resolving the node's types after warm-up: {(time.perf_counter() - started) * 1e6:.1f} us")
@@ -0,0 +1,483 @@
+import contextlib
+import io
+import json
+import pathlib
+import resource
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import typing as t
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver, JsonPlusSerializer
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, StateGraph
+from langgraph.graph.state import CompiledStateGraph
+from pydantic import BaseModel
+
+from checkpoint_models import ModelSerializer
+from cow_state import CowState, cow_node
+
+type SaverName = t.Literal["memory", "sqlite"]
+type SerializerName = t.Literal["jsonplus", "model"]
+
+# Lower is better for all of them.
+METRICS = ("wall_seconds", "step_p50_seconds", "step_p95_seconds", "peak_rss_mb", "checkpoint_bytes")
+
+
+class Scenario(BaseModel):
+    name: str
+    size: int
+    iterations: int = 20
+    saver: SaverName = "memory"
+    serializer: SerializerName = "jsonplus"
+
+    def key(self) -> str:
+        return f"{self.name}[size={self.size},saver={self.saver},serializer={self.serializer}]"
+
+
+class ScenarioResult(BaseModel):
+    """
+    Per iteration, i.e. per thread run to completion: the median wall time, the supersteps and the
+    bytes serialized (checkpoints, channel blobs and pending writes). A step's latency is the time
+    between two checkpoints, so it includes the checkpoint write.
+    """
+    scenario: Scenario
+    wall_seconds: float
+    step_p50_seconds: float
+    step_p95_seconds: float
+    steps: int
+    peak_rss_mb: float
+    checkpoint_bytes: int
+
+
+class CountingSerializer:
+    """
+    Wraps a serializer and counts the bytes it writes.
+    """
+
+    def __init__(self, inner: t.Any):
+        self.inner = inner
+        self.bytes_written = 0
+
+    def dumps_typed(self, obj: t.Any) -> tuple[str, bytes]:
+        type_, data = self.inner.dumps_typed(obj)
+        self.bytes_written += len(data)
+        return type_, data
+
+    def loads_typed(self, data: tuple[str, bytes]) -> t.Any:
+        return self.inner.loads_typed(data)
+
+
+def make_checkpointer(saver: SaverName, serde: CountingSerializer, directory: str) -> BaseCheckpointSaver:
+    if saver == "memory":
+        return InMemorySaver(serde=serde)
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    conn = sqlite3.connect(f"{directory}/checkpoints.db", check_same_thread=False)
+    return SqliteSaver(conn, serde=serde)
+
+
+def timed_stream(app: CompiledStateGraph, input: t.Any, config: RunnableConfig, step_seconds: list[float]) -> None:
+    last = time.perf_counter()
+    for _ in app.stream(input, config, stream_mode="checkpoints"):
+        now = time.perf_counter()
+        step_seconds.append(now - last)
+        last = now
+
+
+type Build = t.Callable[[int, BaseCheckpointSaver], CompiledStateGraph]
+type Run = t.Callable[[CompiledStateGraph, int, RunnableConfig, list[float]], None]
+
+
+def linear_chain(size: int, checkpointer: BaseCheckpointSaver) -> CompiledStateGraph:
+    """
+    `simple_linear_pydantic_graph` with `size` Bar -> Bar nodes between the first and final nodes.
+    """
+    from langgraph_quirks import Bar, Baz, Blat, Foo
+
+    def first_node(state: Foo) -> Bar:
+        return Bar(bar_field=len(state.foo_field))
+
+    def increment(state: Bar) -> Bar:
+        return Bar(bar_field=state.bar_field + 1)
+
+    def second_node(state: Bar) -> Baz:
+        return Baz(baz_field=float(state.bar_field) * 2.5)
+
+    def final_node(state: Baz) -> Blat:
+        return Blat(blat_field=state.baz_field > 10)
+
+    graph = StateGraph(state_schema=Foo, input_schema=Foo, output_schema=Blat)
+    graph.add_sequence([
+        ("first_node", first_node),
+        *((f"increment_{i}", increment) for i in range(size)),
+        ("second_node", second_node),
+        ("final_node", final_node),
+    ])
+    graph.set_entry_point("first_node")
+    graph.add_edge("final_node", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def run_linear_chain(app: CompiledStateGraph, size: int, config: RunnableConfig, step_seconds: list[float]) -> None:
+    from langgraph_quirks import Foo
+
+    timed_stream(app, Foo(foo_field="hello"), config, step_seconds)
+
+
+def typed_channels(size: int, checkpointer: BaseCheckpointSaver) -> CompiledStateGraph:
+    """
+    `workflow_test`: one channel per model type, with `size` GenericClass[Bar] nodes in the subgraph.
+    """
+    from langgraph_heterogeneous_state import Bar, Baz, Blat, Foo, GenericClass, langgraph_pydantic_node
+
+    @langgraph_pydantic_node(Foo, Bar)
+    def foo_to_bar(state: Foo) -> Bar:
+        return Bar(bar_field=len(state.foo_field))
+
+    @langgraph_pydantic_node(Bar, GenericClass[Bar])
+    def bar_to_generic(state: Bar) -> GenericClass[Bar]:
+        return GenericClass[Bar](item=state)
+
+    @langgraph_pydantic_node(GenericClass[Bar], GenericClass[Bar])
+    def generic_to_generic(state: GenericClass[Bar]) -> GenericClass[Bar]:
+        return GenericClass[Bar](item=Bar(bar_field=state.item.bar_field + 1))
+
+    @langgraph_pydantic_node(GenericClass[Bar], Blat)
+    def generic_to_blat(state: GenericClass[Bar]) -> Blat:
+        return Blat(blat_field=[str(state.item.bar_field)] * state.item.bar_field)
+
+    @langgraph_pydantic_node(Blat, Baz)
+    def blat_to_baz(state: Blat) -> Baz:
+        return Baz(baz_field=Bar(bar_field=len(state.blat_field)))
+
+    subgraph = StateGraph(state_schema=dict)
+    subgraph.add_sequence([
+        ("bar_to_generic", bar_to_generic),
+        *((f"generic_to_generic_{i}", generic_to_generic) for i in range(size)),
+        ("generic_to_blat", generic_to_blat),
+    ])
+    subgraph.set_entry_point("bar_to_generic")
+    subgraph.add_edge("generic_to_blat", END)
+
+    graph = StateGraph(state_schema=dict)
+    graph.add_sequence([
+        ("foo_to_bar", foo_to_bar),
+        ("generic_processing", subgraph.compile(checkpointer=True)),
+        ("blat_to_baz", blat_to_baz),
+    ])
+    graph.set_entry_point("foo_to_bar")
+    graph.add_edge("blat_to_baz", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def run_typed_channels(app: CompiledStateGraph, size: int, config: RunnableConfig, step_seconds: list[float]) -> None:
+    from langgraph_heterogeneous_state import Foo, channel_name_for_type
+
+    timed_stream(app, {channel_name_for_type(Foo): Foo(foo_field="hello").model_dump()}, config, step_seconds)
+
+
+def cycle(size: int, checkpointer: BaseCheckpointSaver) -> CompiledStateGraph:
+    """
+    `but_if_you_add_a_cycle`, going around the loop `size` times.
+    """
+    from langgraph_quirks import Bar, Baz, Blat, Foo, LoopState
+
+    def first_node(state: Foo) -> Bar:
+        return Bar(bar_field=len(state.foo_field))
+
+    def second_node(state: Bar) -> Baz:
+        return Baz(baz_field=float(state.bar_field) * 2.5)
+
+    def before_loop_node(state: Baz) -> LoopState:
+        return LoopState(input_baz=state, counter=0)
+
+    def looping_node(state: LoopState) -> LoopState:
+        return LoopState(input_baz=state.input_baz, counter=state.counter + 1)
+
+    def check_loop_state_node(state: LoopState) -> LoopState:
+        return state.model_copy()
+
+    def after_loop_node(state: LoopState) -> Baz:
+        return state.input_baz
+
+    def final_node(state: Baz) -> Blat:
+        return Blat(blat_field=state.baz_field > 1000)
+
+    def check_if_loop(state: LoopState) -> str:
+        return "loop" if state.counter < size else "continue"
+
+    graph = StateGraph(state_schema=Foo, input_schema=Foo, output_schema=Blat)
+    graph.add_sequence([
+        ("first_node", first_node),
+        ("second_node", second_node),
+        ("before_loop_node", before_loop_node),
+        ("looping_node", looping_node),
+        ("check_loop_state_node", check_loop_state_node),
+    ])
+    graph.add_conditional_edges("check_loop_state_node", check_if_loop, {"loop": "looping_node", "continue": "after_loop_node"})
+    graph.add_node("after_loop_node", after_loop_node)
+    graph.add_node("final_node", final_node)
+    graph.add_edge("after_loop_node", "final_node")
+    graph.set_entry_point("first_node")
+    graph.add_edge("final_node", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def run_cycle(app: CompiledStateGraph, size: int, config: RunnableConfig, step_seconds: list[float]) -> None:
+    from langgraph_quirks import Foo
+
+    timed_stream(app, Foo(foo_field="hello"), config, step_seconds)
+
+
+def subgraph_interrupt(size: int, checkpointer: BaseCheckpointSaver) -> CompiledStateGraph:
+    from langgraph_interrupt_test import setup_workflow_with_subgraph
+
+    return setup_workflow_with_subgraph(checkpointer)
+
+
+def run_subgraph_interrupt(app: CompiledStateGraph, size: int, config: RunnableConfig, step_seconds: list[float]) -> None:
+    """
+    `test_langgraph_with_interrupt_in_subgraph`: interrupt, resume `size` times without approval,
+    then approve through the subgraph's state and resume to the end.
+    """
+    from langgraph_interrupt_test import OuterGraphState, SubgraphState
+
+    timed_stream(app, OuterGraphState(prompt="Please perform a sensitive_action now."), config, step_seconds)
+    for _ in range(size):
+        timed_stream(app, None, config, step_seconds)
+    state = app.get_state(config, subgraphs=True)
+    task = next(task for task in state.tasks if task.interrupts)
+    subgraph_state = SubgraphState.model_validate(task.state.values)  # type: ignore[union-attr]
+    subgraph_state.outer_graph_state.approved = True
+    app.update_state({"configurable": {**config["configurable"], "checkpoint_ns": task.name}}, subgraph_state)
+    timed_stream(app, None, config, step_seconds)
+
+
+def fan_out(size: int, checkpointer: BaseCheckpointSaver) -> CompiledStateGraph:
+    """
+    `run_graph` from langgraph_send with `size` chunks, minus the one second of simulated work per chunk.
+    """
+    from langgraph_send import AggregatedState, ChunkState, ReducedState, StartingState, fan_out_node, reduce_states, start_node
+
+    def process_item(state: ChunkState) -> AggregatedState:
+        return AggregatedState(results=[state.chunk_id * 2])
+
+    graph = StateGraph(StartingState, None, input_schema=StartingState, output_schema=ReducedState)
+    graph.add_node("start", start_node)
+    graph.add_conditional_edges("start", fan_out_node)
+    graph.add_node("process_item", process_item)
+    graph.add_node("reduce_states", reduce_states)
+    graph.set_entry_point("start")
+    graph.add_edge("process_item", "reduce_states")
+    graph.add_edge("reduce_states", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def run_fan_out(app: CompiledStateGraph, size: int, config: RunnableConfig, step_seconds: list[float]) -> None:
+    from langgraph_send import StartingState
+
+    timed_stream(app, StartingState(chunks=size), config, step_seconds)
+
+
+class Document(BaseModel):
+    title: str
+    body: str
+
+
+class Corpus(BaseModel):
+    documents: list[Document]
+
+
+class LargeState(BaseModel):
+    corpus: Corpus
+    counter: int = 0
+
+
+class CowDocument(CowState):
+    title: str
+    body: str
+
+
+class CowCorpus(CowState):
+    documents: tuple[CowDocument, ...]
+
+
+class CowLargeState(CowState):
+    corpus: CowCorpus
+    counter: int = 0
+
+
+def corpus_documents(document_cls: type[BaseModel] = Document) -> list[t.Any]:
+    return [document_cls(title=f"document {i}", body="x" * 500) for i in range(200)]
+
+
+def large_state(size: int, checkpointer: BaseCheckpointSaver) -> CompiledStateGraph:
+    """
+    `subgraph_loop_node` over a state with a 100 KB corpus: the node increments a counter in place
+    and returns the whole state, so every step writes the corpus channel again.
+    """
+    def loop_node(state: LargeState) -> LargeState:
+        state.counter += 1
+        return state
+
+    graph = StateGraph(LargeState)
+    graph.add_node("loop_node", loop_node)
+    graph.add_conditional_edges("loop_node", lambda state: "loop" if state.counter < size else "done", {"loop": "loop_node", "done": END})
+    graph.set_entry_point("loop_node")
+    return graph.compile(checkpointer=checkpointer)
+
+
+def run_large_state(app: CompiledStateGraph, size: int, config: RunnableConfig, step_seconds: list[float]) -> None:
+    timed_stream(app, LargeState(corpus=Corpus(documents=corpus_documents())), config, step_seconds)
+
+
+def large_state_cow(size: int, checkpointer: BaseCheckpointSaver) -> CompiledStateGraph:
+    """
+    `large_state` with an immutable CowState: the node evolves the counter and only that channel is
+    written. That saves serializing the corpus on savers that store channels separately
+    (InMemorySaver), not on SqliteSaver, which serializes every channel into each checkpoint.
+    """
+    @cow_node
+    def loop_node(state: CowLargeState) -> CowLargeState:
+        return state.evolve(counter=state.counter + 1)
+
+    graph = StateGraph(CowLargeState)
+    graph.add_node("loop_node", loop_node)
+    graph.add_conditional_edges("loop_node", lambda state: "loop" if state.counter < size else "done", {"loop": "loop_node", "done": END})
+    graph.set_entry_point("loop_node")
+    return graph.compile(checkpointer=checkpointer)
+
+
+def run_large_state_cow(app: CompiledStateGraph, size: int, config: RunnableConfig, step_seconds: list[float]) -> None:
+    timed_stream(app, CowLargeState(corpus=CowCorpus(documents=tuple(corpus_documents(CowDocument)))), config, step_seconds)
+
+
+SCENARIOS: dict[str, tuple[Build, Run, int]] = {
+    "linear_chain": (linear_chain, run_linear_chain, 10),
+    "typed_channels": (typed_channels, run_typed_channels, 10),
+    "cycle": (cycle, run_cycle, 20),
+    "subgraph_interrupt": (subgraph_interrupt, run_subgraph_interrupt, 3),
+    "fan_out": (fan_out, run_fan_out, 20),
+    "large_state": (large_state, run_large_state, 20),
+    "large_state_cow": (large_state_cow, run_large_state_cow, 20),
+}
+
+
+def run_scenario(scenario: Scenario) -> ScenarioResult:
+    """
+    Runs the scenario in this process. Peak RSS is the process's high-water mark, so it is only
+    meaningful for the first scenario a process runs; see `run_isolated`.
+    """
+    build, run, _ = SCENARIOS[scenario.name]
+    serde = CountingSerializer(ModelSerializer() if scenario.serializer == "model" else JsonPlusSerializer())
+    with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+        app = build(scenario.size, make_checkpointer(scenario.saver, serde, directory))
+
+        def config(thread_id: str) -> RunnableConfig:
+            # Big sizes take more steps than LangGraph's default limit of 25 allows.
+            return {"configurable": {"thread_id": thread_id}, "recursion_limit": 10_000}
+
+        # One untimed thread to warm up schemas and caches.
+        run(app, scenario.size, config("warm_up"), [])
+        serde.bytes_written = 0
+        wall_seconds: list[float] = []
+        step_seconds: list[float] = []
+        for i in range(scenario.iterations):
+            started = time.perf_counter()
+            run(app, scenario.size, config(f"thread_{i}"), step_seconds)
+            wall_seconds.append(time.perf_counter() - started)
+    return ScenarioResult(
+        scenario=scenario,
+        wall_seconds=statistics.median(wall_seconds),
+        step_p50_seconds=statistics.median(step_seconds),
+        step_p95_seconds=statistics.quantiles(step_seconds, n=20)[18] if len(step_seconds) > 1 else step_seconds[0],
+        steps=len(step_seconds) // scenario.iterations,
+        # ru_maxrss is in KiB on Linux.
+        peak_rss_mb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        checkpoint_bytes=serde.bytes_written // scenario.iterations,
+    )
+
+
+def run_isolated(scenario: Scenario, python: str = sys.executable) -> ScenarioResult:
+    """
+    Runs the scenario in a fresh interpreter so that its peak RSS is its own.
+    """
+    completed = subprocess.run(
+        [python, __file__, "_worker", scenario.model_dump_json()],
+        capture_output=True,
+        text=True,
+        cwd=pathlib.Path(__file__).parent,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{scenario.key()} failed:\n{completed.stderr}")
+    return ScenarioResult.model_validate_json(completed.stdout.strip().splitlines()[-1])
+
+
+def print_result(result: ScenarioResult) -> None:
+    print(
+        f"{result.scenario.key()}: {result.wall_seconds * 1e3:.2f} ms/run, {result.steps} steps, "
+        f"step p50 {result.step_p50_seconds * 1e3:.2f} ms p95 {result.step_p95_seconds * 1e3:.2f} ms, "
+        f"{result.peak_rss_mb:.0f} MB RSS, {result.checkpoint_bytes} checkpoint bytes/run"
+    )
+
+
+def load_baseline(path: pathlib.Path) -> dict[str, ScenarioResult]:
+    return {key: ScenarioResult.model_validate(result) for key, result in json.loads(path.read_text()).items()}
+
+
+def compare(baseline: dict[str, ScenarioResult], current: dict[str, ScenarioResult], threshold: float = 0.1) -> list[str]:
+    """
+    One line per metric that got worse by more than `threshold` (0.1 for 10%) in a scenario both
+    runs have.
+    """
+    regressions = []
+    for key in baseline.keys() & current.keys():
+        for metric in METRICS:
+            before, after = getattr(baseline[key], metric), getattr(current[key], metric)
+            if before and after / before > 1 + threshold:
+                regressions.append(f"{key} {metric}: {before:.6g} -> {after:.6g} (+{after / before - 1:.0%})")
+    return sorted(regressions)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the graph shapes from the experiments")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Run scenarios and optionally save them as a baseline")
+    run_parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    run_parser.add_argument("--size", type=int, help="Overrides each scenario's default size")
+    run_parser.add_argument("--iterations", type=int, default=20)
+    run_parser.add_argument("--savers", nargs="+", default=["memory", "sqlite"], choices=["memory", "sqlite"])
+    run_parser.add_argument("--serializers", nargs="+", default=["jsonplus", "model"], choices=["jsonplus", "model"])
+    run_parser.add_argument("--output", type=pathlib.Path, help="Write the results to this JSON file")
+    compare_parser = commands.add_parser("compare", help="Flag regressions between two result files")
+    compare_parser.add_argument("baseline", type=pathlib.Path)
+    compare_parser.add_argument("current", type=pathlib.Path)
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    worker_parser = commands.add_parser("_worker")
+    worker_parser.add_argument("scenario")
+    args = parser.parse_args()
+
+    if args.command == "_worker":
+        print(run_scenario(Scenario.model_validate_json(args.scenario)).model_dump_json())
+    elif args.command == "run":
+        results: dict[str, t.Any] = {}
+        for name in args.scenarios:
+            for saver in args.savers:
+                for serializer in args.serializers:
+                    scenario = Scenario(name=name, size=args.size or SCENARIOS[name][2], iterations=args.iterations, saver=saver, serializer=serializer)
+                    result = run_isolated(scenario)
+                    print_result(result)
+                    results[scenario.key()] = result.model_dump()
+        if args.output:
+            args.output.write_text(json.dumps(results, indent=2))
+    else:
+        regressions = compare(load_baseline(args.baseline), load_baseline(args.current), args.threshold)
+        print("\n".join(regressions) or f"No regressions beyond {args.threshold:.0%}")
+        sys.exit(1 if regressions else 0)
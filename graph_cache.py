@@ -0,0 +1,186 @@
+import collections
+import functools
+import hashlib
+import threading
+import types
+import typing as t
+
+if t.TYPE_CHECKING:
+    from langgraph.graph import StateGraph
+    from langgraph.graph.state import CompiledStateGraph
+
+_SCALARS = (type(None), bool, int, float, complex, str, bytes)
+
+
+def _part(obj: t.Any) -> t.Any:
+    """
+    A repr-able stand-in for one piece of a builder. Code is identified by its code object, so the
+    same `def` in two calls of a setup function matches. Closure cells are identified by the cell
+    itself, not by what it holds: the enclosing function may rebind the variable after compiling
+    (`kaboom = True`), and a graph compiled from another call would not see that. Everything else
+    that is not a plain value is identified by the object; cached graphs keep those objects alive,
+    so their ids cannot be reused while the entry exists.
+    """
+    if isinstance(obj, _SCALARS):
+        return obj
+    if isinstance(obj, (tuple, list)):
+        return (type(obj).__name__, *(_part(item) for item in obj))
+    if isinstance(obj, (set, frozenset)):
+        return ("set", *sorted((_part(item) for item in obj), key=repr))
+    if isinstance(obj, dict):
+        return ("dict", *sorted(((_part(key), _part(value)) for key, value in obj.items()), key=repr))
+    if isinstance(obj, type):
+        return ("type", obj.__module__, obj.__qualname__, id(obj))
+    if isinstance(obj, types.FunctionType):
+        return (
+            "function",
+            obj.__module__,
+            obj.__qualname__,
+            id(obj.__code__),
+            _part(obj.__defaults__),
+            _part(obj.__kwdefaults__),
+            tuple(("cell", id(cell)) for cell in obj.__closure__ or ()),
+        )
+    if isinstance(obj, types.MethodType):
+        return ("method", _part(obj.__func__), id(obj.__self__))
+    if isinstance(obj, functools.partial):
+        return ("partial", _part(obj.func), _part(obj.args), _part(obj.keywords))
+    builder = getattr(obj, "builder", None)
+    if builder is not None and hasattr(builder, "nodes"):
+        # A compiled subgraph.
+        return (
+            "graph",
+            _builder_parts(builder),
+            _part(obj.checkpointer),
+            _part(obj.interrupt_before_nodes),
+            _part(obj.interrupt_after_nodes),
+            obj.name,
+        )
+    if hasattr(obj, "func") and hasattr(obj, "afunc"):
+        # RunnableCallable and RunnableLambda, which wrap node and branch functions.
+        return ("callable", type(obj).__qualname__, _part(obj.func), _part(obj.afunc), getattr(obj, "name", None))
+    return ("object", type(obj).__qualname__, id(obj))
+
+
+def _builder_parts(builder: "StateGraph") -> tuple[t.Any, ...]:
+    nodes = tuple(
+        (name, _part(spec.runnable), _part(spec.metadata), _part(spec.input_schema), _part(spec.retry_policy), _part(spec.cache_policy), _part(spec.ends), spec.defer)
+        for name, spec in sorted(builder.nodes.items())
+    )
+    branches = tuple(
+        (start, name, _part(branch.path), _part(branch.ends), _part(branch.input_schema))
+        for start, by_name in sorted(builder.branches.items())
+        for name, branch in sorted(by_name.items())
+    )
+    return (
+        _part(builder.state_schema),
+        _part(builder.input_schema),
+        _part(builder.output_schema),
+        _part(builder.context_schema),
+        nodes,
+        tuple(sorted(builder.edges)),
+        tuple(sorted((tuple(starts), end) for starts, end in builder.waiting_edges)),
+        branches,
+    )
+
+
+def builder_fingerprint(builder: "StateGraph", **compile_kwargs: t.Any) -> str:
+    """
+    A digest of everything `builder.compile(**compile_kwargs)` depends on: schemas, nodes, edges,
+    branches, and the compile arguments, with the checkpointer, store and cache by identity.
+    Subgraph nodes are fingerprinted structurally, through their own builders.
+    """
+    parts = (_builder_parts(builder), _part(compile_kwargs))
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+class GraphCache:
+    """
+    Compiled graphs by builder fingerprint, so that a setup function that rebuilds the same
+    StateGraph on every request compiles it once per process. Compiled graphs hold no per-run
+    state (that lives in the checkpointer, per thread_id), so one instance can serve any number of
+    threads and asyncio tasks.
+
+    Least recently used graphs beyond `max_entries` are dropped, which bounds the cache when a
+    builder cannot match, e.g. nodes that close over per-request variables. A graph keeps its
+    checkpointer alive, so compile graphs for a checkpointer made per call without the cache.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._graphs: collections.OrderedDict[str, "CompiledStateGraph"] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._compiling: dict[str, threading.Lock] = {}
+
+    def compile(self, builder: "StateGraph", **compile_kwargs: t.Any) -> "CompiledStateGraph":
+        key = builder_fingerprint(builder, **compile_kwargs)
+        with self._lock:
+            graph = self._graphs.get(key)
+            if graph is not None:
+                self._graphs.move_to_end(key)
+                self.hits += 1
+                return graph
+            key_lock = self._compiling.setdefault(key, threading.Lock())
+        # Only one caller compiles a given fingerprint; the others wait for its result.
+        with key_lock:
+            try:
+                with self._lock:
+                    graph = self._graphs.get(key)
+                    if graph is not None:
+                        self.hits += 1
+                        return graph
+                graph = builder.compile(**compile_kwargs)
+                with self._lock:
+                    self.misses += 1
+                    self._graphs[key] = graph
+                    if len(self._graphs) > self.max_entries:
+                        self._graphs.popitem(last=False)
+            finally:
+                with self._lock:
+                    self._compiling.pop(key, None)
+        return graph
+
+    def clear(self) -> None:
+        with self._lock:
+            self._graphs.clear()
+
+
+@functools.cache
+def default_graph_cache() -> GraphCache:
+    return GraphCache()
+
+
+def cached_compile(builder: "StateGraph", **compile_kwargs: t.Any) -> "CompiledStateGraph":
+    """
+    `builder.compile(**compile_kwargs)`, or the graph compiled earlier from an identical builder.
+    """
+    return default_graph_cache().compile(builder, **compile_kwargs)
+
+
+if __name__ == "__main__":
+    import timeit
+
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    import graph_cache
+    from langgraph_interrupt_test import OuterGraphState, setup_workflow_with_subgraph
+
+    checkpointer = InMemorySaver()
+    app = setup_workflow_with_subgraph(checkpointer)
+    assert setup_workflow_with_subgraph(checkpointer) is app
+    assert setup_workflow_with_subgraph(InMemorySaver()) is not app
+    # The default saver is new on every call and is not cached.
+    misses = graph_cache.default_graph_cache().misses
+    setup_workflow_with_subgraph()
+    assert graph_cache.default_graph_cache().misses == misses
+    app.invoke(OuterGraphState(prompt="Nothing sensitive."), {"configurable": {"thread_id": "cached"}})
+
+    n = 200
+    cached = timeit.timeit(lambda: setup_workflow_with_subgraph(checkpointer), number=n) / n
+    # The cache setup_workflow_with_subgraph uses: this file runs as __main__, a separate module.
+    cache = graph_cache.default_graph_cache()
+    uncached = timeit.timeit(lambda: (cache.clear(), setup_workflow_with_subgraph(checkpointer)), number=n) / n
+    print(f"setup_workflow_with_subgraph: compiled every call {uncached * 1e3:.2f} ms, cached {cached * 1e3:.2f} ms ({uncached / cached:.1f}x)")
+    print(f"hits {cache.hits}, misses {cache.misses}")
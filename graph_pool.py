@@ -0,0 +1,296 @@
+import asyncio
+import bisect
+import concurrent.futures
+import contextlib
+import hashlib
+import itertools
+import multiprocessing
+import multiprocessing.connection
+import os
+import pickle
+import sqlite3
+import sys
+import tempfile
+import threading
+import traceback
+import typing as t
+
+if t.TYPE_CHECKING:
+    from langgraph.checkpoint.base import BaseCheckpointSaver
+    from langgraph.graph.state import CompiledStateGraph
+
+type GraphFactory = t.Callable[["BaseCheckpointSaver"], "CompiledStateGraph"]
+type Saver = t.Literal["memory", "sqlite"]
+
+
+def _hash(key: str) -> int:
+    # Not hash(): str hashes are salted per process, and shard databases outlive the dispatcher.
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest())
+
+
+class HashRing:
+    """
+    Consistent hashing of keys onto shards 0 to `shards - 1`. Each shard owns `replicas` points on
+    the ring, so going from N to N + 1 shards moves about 1 / (N + 1) of the keys, all of them to
+    the new shard.
+    """
+
+    def __init__(self, shards: int, replicas: int = 64):
+        points = sorted((_hash(f"shard-{shard}-{replica}"), shard) for shard in range(shards) for replica in range(replicas))
+        self._hashes = [point for point, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    def shard(self, key: str) -> int:
+        return self._shards[bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)]
+
+
+def _checkpointer(saver: Saver, directory: str, shard: int) -> "BaseCheckpointSaver":
+    if saver == "memory":
+        from langgraph.checkpoint.memory import InMemorySaver
+
+        return InMemorySaver()
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    return SqliteSaver(sqlite3.connect(os.path.join(directory, f"shard_{shard}.db"), check_same_thread=False))
+
+
+def _portable(exc: Exception, method: str, shard: int) -> Exception:
+    """
+    `exc` if it survives pickling, else a RuntimeError carrying its type, message and traceback.
+    Many exceptions pickle but cannot be unpickled, e.g. ones with keyword-only __init__ arguments.
+    """
+    try:
+        pickle.loads(pickle.dumps(exc))
+        return exc
+    except Exception:
+        remote = "".join(traceback.format_exception(exc))
+        return RuntimeError(f"{method} on shard {shard} raised {type(exc).__qualname__}: {exc}\n{remote}")
+
+
+def _worker(
+    conn: multiprocessing.connection.Connection,
+    factory: GraphFactory,
+    shard: int,
+    saver: Saver,
+    directory: str,
+    threads: int,
+    quiet: bool,
+) -> None:
+    """
+    One shard: compiles its own graph on its own checkpointer and serves (request id, method,
+    args, kwargs) requests until it receives None. Each answer is (request id, ok, pickled result
+    or exception), pickled separately so the dispatcher can fail the one call it cannot load.
+    """
+    if quiet:
+        sys.stdout = open(os.devnull, "w")
+    app = factory(_checkpointer(saver, directory, shard))
+    # Ready.
+    conn.send(None)
+    send_lock = threading.Lock()
+
+    def run(request_id: int, method: str, args: tuple, kwargs: dict) -> None:
+        try:
+            ok, value = True, getattr(app, method)(*args, **kwargs)
+        except Exception as exc:
+            ok, value = False, _portable(exc, method, shard)
+        try:
+            payload = pickle.dumps(value)
+        except Exception as exc:
+            ok, payload = False, pickle.dumps(RuntimeError(f"{method} on shard {shard}: cannot pickle {value!r} ({exc})"))
+        with send_lock:
+            conn.send((request_id, ok, payload))
+
+    with concurrent.futures.ThreadPoolExecutor(threads) as executor:
+        while (request := conn.recv()) is not None:
+            executor.submit(run, *request)
+
+
+class _Shard:
+    __slots__ = ("process", "conn", "send_lock", "pending", "error")
+
+    def __init__(self, process: multiprocessing.process.BaseProcess, conn: multiprocessing.connection.Connection):
+        self.process = process
+        self.conn = conn
+        self.send_lock = threading.Lock()
+        # Request id -> future, for requests this shard has not answered yet.
+        self.pending: dict[int, concurrent.futures.Future] = {}
+        # Set once the connection to the worker is lost; new calls fail with it.
+        self.error: Exception | None = None
+
+
+class GraphPool:
+    """
+    Runs a graph in `processes` worker processes, so that CPU-bound nodes are not limited to one
+    core by the GIL. Every worker compiles its own graph with `factory` on its own checkpointer,
+    and thread_ids are sharded across workers by consistent hashing: all calls for a thread,
+    including resumes and update_state, reach the worker that holds its state.
+
+    With saver="sqlite", shard i keeps its checkpoints in `directory`/shard_i.db, so a pool with
+    the same number of processes picks up where an earlier one stopped. Changing the number of
+    processes moves some threads to shards that do not have their checkpoints.
+
+    invoke, get_state and update_state block; the a-prefixed variants await the same call. Inputs,
+    results and exceptions cross process boundaries by pickling.
+    """
+
+    def __init__(
+        self,
+        factory: GraphFactory | None = None,
+        processes: int | None = None,
+        saver: Saver = "memory",
+        directory: str | None = None,
+        threads: int = 4,
+        quiet: bool = False,
+    ):
+        if factory is None:
+            from langgraph_interrupt_test import setup_workflow_with_subgraph
+
+            factory = setup_workflow_with_subgraph
+        processes = processes or os.cpu_count() or 1
+        self._tempdir = tempfile.TemporaryDirectory() if directory is None and saver == "sqlite" else None
+        directory = self._tempdir.name if self._tempdir else directory or ""
+        self.ring = HashRing(processes)
+        self._ids = itertools.count()
+        self._closed = False
+        self._shards: list[_Shard] = []
+        # spawn, not fork: forking a process that runs threads can copy held locks.
+        context = multiprocessing.get_context("spawn")
+        for shard in range(processes):
+            conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_worker,
+                args=(child_conn, factory, shard, saver, directory, threads, quiet),
+                name=f"graph-shard-{shard}",
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self._shards.append(_Shard(process, conn))
+        # Workers import and compile in parallel; wait until every one of them can take requests.
+        for shard in self._shards:
+            try:
+                shard.conn.recv()
+            except EOFError:
+                self.close()
+                raise RuntimeError(f"{shard.process.name} failed to start; see its traceback above") from None
+            threading.Thread(target=self._receive, args=(shard,), name=f"{shard.process.name}-receiver", daemon=True).start()
+
+    def _fail_pending(self, shard: _Shard, error: Exception) -> None:
+        for request_id in list(shard.pending):
+            future = shard.pending.pop(request_id, None)
+            if future is not None:
+                future.set_exception(error)
+
+    def _receive(self, shard: _Shard) -> None:
+        while True:
+            try:
+                request_id, ok, payload = shard.conn.recv()
+            except (EOFError, OSError):
+                break
+            except Exception as exc:
+                # The answer's request id is unreadable, so no single call can be failed.
+                self._fail_pending(shard, RuntimeError(f"{shard.process.name} sent an unreadable answer: {exc!r}"))
+                continue
+            future = shard.pending.pop(request_id, None)
+            if future is None:
+                continue
+            try:
+                value = pickle.loads(payload)
+            except Exception as exc:
+                future.set_exception(RuntimeError(f"{shard.process.name} sent a result that cannot be unpickled: {exc!r}"))
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+        shard.process.join(timeout=1)
+        shard.error = RuntimeError(f"{shard.process.name} exited with code {shard.process.exitcode}")
+        self._fail_pending(shard, shard.error)
+
+    def shard_for(self, config: t.Any) -> int:
+        thread_id = (config or {}).get("configurable", {}).get("thread_id")
+        if thread_id is None:
+            raise ValueError("GraphPool routes by thread_id; pass config={'configurable': {'thread_id': ...}}")
+        return self.ring.shard(str(thread_id))
+
+    def submit(self, method: str, config: t.Any, *args: t.Any, **kwargs: t.Any) -> concurrent.futures.Future:
+        """
+        Calls `method` on the compiled graph of the shard that owns `config`'s thread_id, with
+        `args` and `kwargs`.
+        """
+        if self._closed:
+            raise RuntimeError("GraphPool is closed")
+        shard = self._shards[self.shard_for(config)]
+        if shard.error is not None:
+            raise shard.error
+        request_id = next(self._ids)
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        shard.pending[request_id] = future
+        with shard.send_lock:
+            try:
+                shard.conn.send((request_id, method, args, kwargs))
+            except Exception:
+                shard.pending.pop(request_id, None)
+                raise
+        return future
+
+    def invoke(self, input: t.Any, config: t.Any, **kwargs: t.Any) -> t.Any:
+        return self.submit("invoke", config, input, config, **kwargs).result()
+
+    async def ainvoke(self, input: t.Any, config: t.Any, **kwargs: t.Any) -> t.Any:
+        return await asyncio.wrap_future(self.submit("invoke", config, input, config, **kwargs))
+
+    def get_state(self, config: t.Any, **kwargs: t.Any) -> t.Any:
+        return self.submit("get_state", config, config, **kwargs).result()
+
+    async def aget_state(self, config: t.Any, **kwargs: t.Any) -> t.Any:
+        return await asyncio.wrap_future(self.submit("get_state", config, config, **kwargs))
+
+    def update_state(self, config: t.Any, values: t.Any, as_node: str | None = None, **kwargs: t.Any) -> t.Any:
+        return self.submit("update_state", config, config, values, as_node, **kwargs).result()
+
+    async def aupdate_state(self, config: t.Any, values: t.Any, as_node: str | None = None, **kwargs: t.Any) -> t.Any:
+        return await asyncio.wrap_future(self.submit("update_state", config, config, values, as_node, **kwargs))
+
+    def close(self) -> None:
+        """
+        Lets every worker finish the requests it has received, then stops it.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for shard in self._shards:
+            with shard.send_lock, contextlib.suppress(OSError):
+                shard.conn.send(None)
+        for shard in self._shards:
+            shard.process.join()
+            shard.conn.close()
+        if self._tempdir:
+            self._tempdir.cleanup()
+
+    def __enter__(self) -> t.Self:
+        return self
+
+    def __exit__(self, *exc_info: t.Any) -> None:
+        self.close()
+
+
+if __name__ == "__main__":
+    import time
+
+    from approval_load import STEPS
+
+    lifecycles = 200
+    for processes in sorted({1, os.cpu_count() or 1}):
+        with GraphPool(processes=processes, quiet=True) as pool:
+            started = time.perf_counter()
+            with concurrent.futures.ThreadPoolExecutor(4 * processes) as executor:
+                def lifecycle(i: int) -> None:
+                    for step in STEPS.values():
+                        step(pool, f"pool_{i}")
+
+                list(executor.map(lifecycle, range(lifecycles)))
+            elapsed = time.perf_counter() - started
+            state = pool.get_state({"configurable": {"thread_id": "pool_0"}})
+            assert state.values["approved"] and not state.next
+            print(f"{processes} process(es): {lifecycles / elapsed:.1f} lifecycles/s")
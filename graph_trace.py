@@ -0,0 +1,325 @@
+import functools
+import inspect
+import json
+import pathlib
+import random
+import threading
+import time
+import typing as t
+import uuid
+
+if t.TYPE_CHECKING:
+    from langchain_core.runnables import RunnableConfig
+
+SAMPLE_RATE_KEY = "trace_sample_rate"
+
+
+def _now_us() -> float:
+    return time.perf_counter() * 1e6
+
+
+class _Run:
+    __slots__ = ("name", "cat", "started", "os_thread", "args", "root", "hidden", "interrupt_ids")
+
+    def __init__(self, name: str, cat: str, os_thread: int, args: dict[str, t.Any], root: uuid.UUID, hidden: bool):
+        self.name = name
+        self.cat = cat
+        self.started = _now_us()
+        self.os_thread = os_thread
+        self.args = args
+        self.root = root
+        self.hidden = hidden
+        # On the top-level run only: interrupts already recorded in this trace.
+        self.interrupt_ids: set[str] = set()
+
+
+class Span(t.NamedTuple):
+    name: str
+    cat: str
+    started_us: float
+    ended_us: float
+    thread_id: str | None
+    os_thread: int
+    args: dict[str, t.Any]
+    root: uuid.UUID | None = None
+
+
+class GraphTracer:
+    """
+    Records spans for LangGraph runs and exports them as Chrome trace-event JSON, which Perfetto
+    (ui.perfetto.dev) and chrome://tracing open directly.
+
+    Spans come from a LangChain callback handler (`tracer.handler`) for graphs, subgraphs and node
+    tasks, and from `trace_checkpointer` for checkpoint writes. Interrupts are instant events.
+    Each LangGraph thread_id is shown as a process and each OS thread as a thread, so parallel
+    branches sit side by side; on export, every superstep also gets a span covering its tasks.
+
+    Sampling is decided once per top-level run, so a trace is never partial. The rate is
+    `trace_sample_rate` from the run's configurable or metadata, defaulting to `sample_rate`:
+
+        config = {"configurable": {"thread_id": "1", "trace_sample_rate": 0.01}, "callbacks": [tracer.handler]}
+
+    Unsampled runs cost a dict insert and pop per runnable.
+    """
+
+    def __init__(self, sample_rate: float = 1.0, max_spans: int = 100_000):
+        self.sample_rate = sample_rate
+        self.max_spans = max_spans
+        self.spans: list[Span] = []
+        self.instants: list[Span] = []
+        self.dropped = 0
+        self._runs: dict[uuid.UUID, _Run | None] = {}
+        # thread_id -> sampled top-level run, to attribute checkpoint writes, which carry no run id.
+        self._active_threads: dict[str, uuid.UUID] = {}
+        self._lock = threading.Lock()
+
+    @functools.cached_property
+    def handler(self) -> t.Any:
+        return _handler_class()(self)
+
+    def config(self, config: "RunnableConfig | None" = None, sample_rate: float | None = None) -> "RunnableConfig":
+        """
+        `config` with this tracer's handler added and, optionally, a sample rate for its runs.
+        """
+        config = dict(config or {})  # type: ignore[assignment]
+        callbacks = config.get("callbacks") or []
+        config["callbacks"] = [*callbacks, self.handler]
+        if sample_rate is not None:
+            config["configurable"] = {**config.get("configurable", {}), SAMPLE_RATE_KEY: sample_rate}
+        return config  # type: ignore[return-value]
+
+    def _record(self, span: Span, instant: bool = False) -> None:
+        with self._lock:
+            if len(self.spans) + len(self.instants) >= self.max_spans:
+                self.dropped += 1
+            elif instant:
+                self.instants.append(span)
+            else:
+                self.spans.append(span)
+
+    def _start(
+        self,
+        run_id: uuid.UUID,
+        parent_run_id: uuid.UUID | None,
+        name: str,
+        tags: list[str] | None,
+        metadata: dict[str, t.Any] | None,
+    ) -> None:
+        metadata = metadata or {}
+        if parent_run_id is None:
+            rate = metadata.get(SAMPLE_RATE_KEY, self.sample_rate)
+            if rate < 1.0 and random.random() >= rate:
+                self._runs[run_id] = None
+                return
+            root = run_id
+            thread_id = metadata.get("thread_id")
+            if thread_id is not None:
+                self._active_threads[str(thread_id)] = run_id
+        else:
+            parent = self._runs.get(parent_run_id)
+            if parent is None:
+                # Unsampled, or started before the handler was attached.
+                self._runs[run_id] = None
+                return
+            root = parent.root
+        tags = tags or []
+        step = metadata.get("langgraph_step")
+        if any(tag.startswith("graph:step:") for tag in tags):
+            cat = "node"
+            namespace = metadata.get("langgraph_checkpoint_ns", "")
+        else:
+            namespace = metadata.get("checkpoint_ns", "")
+            is_graph = parent_run_id is None or (namespace and namespace == metadata.get("langgraph_checkpoint_ns"))
+            cat = "graph" if is_graph else "runnable"
+        args = {"thread_id": metadata.get("thread_id"), "namespace": namespace, "step": step}
+        self._runs[run_id] = _Run(name, cat, threading.get_ident(), args, root, "langsmith:hidden" in tags)
+
+    def _end(self, run_id: uuid.UUID, error: BaseException | None = None) -> None:
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        ended = _now_us()
+        if run.root == run_id:
+            thread_id = run.args["thread_id"]
+            if thread_id is not None and self._active_threads.get(str(thread_id)) == run_id:
+                del self._active_threads[str(thread_id)]
+        if error is not None:
+            from langgraph.errors import GraphInterrupt
+
+            if isinstance(error, GraphInterrupt):
+                # Raised by the node, then again by every subgraph node above it; mark it once.
+                root = self._runs.get(run.root)
+                interrupt_ids = {str(getattr(interrupt, "id", "")) for interrupt in (error.args[0] if error.args else ())}
+                if run.cat == "node" and root is not None and not interrupt_ids <= root.interrupt_ids:
+                    root.interrupt_ids |= interrupt_ids
+                    self._record(Span("interrupt", "interrupt", ended, ended, run.args["thread_id"], run.os_thread, {**run.args, "node": run.name}, run.root), instant=True)
+                run.args = {**run.args, "interrupted": True}
+            else:
+                run.args = {**run.args, "error": f"{type(error).__name__}: {error}"}
+        if not run.hidden:
+            self._record(Span(run.name, run.cat, run.started, ended, run.args["thread_id"], run.os_thread, run.args, run.root))
+
+    def trace_checkpointer[S](self, checkpointer: S) -> S:
+        """
+        Records a span for every checkpoint and pending-writes save of sampled runs. Patches and
+        returns the same checkpointer.
+        """
+        def wrap(method: t.Callable[..., t.Any], name: str) -> t.Callable[..., t.Any]:
+            def span(config: dict[str, t.Any], started: float, extra: dict[str, t.Any]) -> None:
+                configurable = config.get("configurable", {})
+                thread_id = configurable.get("thread_id")
+                if thread_id is None or str(thread_id) not in self._active_threads:
+                    return
+                args = {"thread_id": thread_id, "namespace": configurable.get("checkpoint_ns", ""), **extra}
+                self._record(Span(name, "checkpoint", started, _now_us(), thread_id, threading.get_ident(), args))
+
+            def details(args: tuple[t.Any, ...], kwargs: dict[str, t.Any]) -> dict[str, t.Any]:
+                if name == "put_writes":
+                    writes = args[1] if len(args) > 1 else kwargs.get("writes", ())
+                    return {"writes": len(writes)}
+                checkpoint = args[1] if len(args) > 1 else kwargs.get("checkpoint", {})
+                return {"checkpoint_id": checkpoint.get("id")}
+
+            if inspect.iscoroutinefunction(method):
+                @functools.wraps(method)
+                async def async_wrapper(config: t.Any, *args: t.Any, **kwargs: t.Any) -> t.Any:
+                    started = _now_us()
+                    try:
+                        return await method(config, *args, **kwargs)
+                    finally:
+                        span(config, started, details((config, *args), kwargs))
+                return async_wrapper
+
+            @functools.wraps(method)
+            def wrapper(config: t.Any, *args: t.Any, **kwargs: t.Any) -> t.Any:
+                started = _now_us()
+                try:
+                    return method(config, *args, **kwargs)
+                finally:
+                    span(config, started, details((config, *args), kwargs))
+            return wrapper
+
+        for name in ("put", "put_writes"):
+            setattr(checkpointer, name, wrap(getattr(checkpointer, name), name))
+            setattr(checkpointer, f"a{name}", wrap(getattr(checkpointer, f"a{name}"), name))
+        return checkpointer
+
+    def events(self) -> list[dict[str, t.Any]]:
+        """
+        The recorded spans as Chrome trace events.
+        """
+        with self._lock:
+            spans, instants = list(self.spans), list(self.instants)
+        pids: dict[str | None, int] = {}
+        tids: dict[int, int] = {}
+        events: list[dict[str, t.Any]] = []
+
+        def ids(span: Span) -> tuple[int, int]:
+            pid = pids.setdefault(span.thread_id, len(pids) + 1)
+            # tid 0 is reserved for the superstep spans.
+            tid = tids.setdefault(span.os_thread, len(tids) + 1)
+            return pid, tid
+
+        steps: dict[tuple[uuid.UUID | None, str | None, str, int], list[float]] = {}
+        for span in spans:
+            pid, tid = ids(span)
+            events.append({"name": span.name, "cat": span.cat, "ph": "X", "ts": span.started_us, "dur": span.ended_us - span.started_us, "pid": pid, "tid": tid, "args": span.args})
+            if span.cat == "node" and span.args["step"] is not None:
+                # Tasks of a subgraph run in the subgraph's namespace, minus their own task segment.
+                namespace = span.args["namespace"].rpartition("|")[0] if "|" in span.args["namespace"] else ""
+                bounds = steps.setdefault((span.root, span.thread_id, namespace, span.args["step"]), [span.started_us, span.ended_us])
+                bounds[0], bounds[1] = min(bounds[0], span.started_us), max(bounds[1], span.ended_us)
+        for (_, thread_id, namespace, step), (started, ended) in steps.items():
+            events.append({"name": f"step {step}", "cat": "superstep", "ph": "X", "ts": started, "dur": ended - started, "pid": pids[thread_id], "tid": 0, "args": {"thread_id": thread_id, "namespace": namespace, "step": step}})
+        for span in instants:
+            pid, tid = ids(span)
+            events.append({"name": span.name, "cat": span.cat, "ph": "i", "s": "t", "ts": span.started_us, "pid": pid, "tid": tid, "args": span.args})
+        for thread_id, pid in pids.items():
+            events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"thread_id {thread_id}"}})
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "supersteps"}})
+            for os_thread, tid in tids.items():
+                events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": f"os thread {os_thread}"}})
+        return events
+
+    def export(self, path: str | pathlib.Path) -> None:
+        pathlib.Path(path).write_text(json.dumps({"traceEvents": self.events(), "displayTimeUnit": "ms", "otherData": {"dropped_spans": self.dropped}}))
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+            self.instants.clear()
+            self.dropped = 0
+
+
+@functools.cache
+def _handler_class() -> type:
+    # Defined on first use so that importing this module does not import LangChain.
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class GraphTraceHandler(BaseCallbackHandler):
+        # Timing must come from the thread that runs the task, not a callback executor.
+        run_inline = True
+
+        def __init__(self, tracer: GraphTracer):
+            self.tracer = tracer
+
+        def on_chain_start(
+            self,
+            serialized: dict[str, t.Any] | None,
+            inputs: t.Any,
+            *,
+            run_id: uuid.UUID,
+            parent_run_id: uuid.UUID | None = None,
+            tags: list[str] | None = None,
+            metadata: dict[str, t.Any] | None = None,
+            **kwargs: t.Any,
+        ) -> None:
+            name = kwargs.get("name") or (serialized or {}).get("name") or "chain"
+            self.tracer._start(run_id, parent_run_id, name, tags, metadata)
+
+        def on_chain_end(self, outputs: t.Any, *, run_id: uuid.UUID, **kwargs: t.Any) -> None:
+            self.tracer._end(run_id)
+
+        def on_chain_error(self, error: BaseException, *, run_id: uuid.UUID, **kwargs: t.Any) -> None:
+            self.tracer._end(run_id, error)
+
+    return GraphTraceHandler
+
+
+if __name__ == "__main__":
+    import sys
+
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    from graph_bench import fan_out
+    from langgraph_interrupt_test import OuterGraphState, SubgraphState, setup_workflow_with_subgraph
+    from langgraph_send import StartingState
+
+    tracer = GraphTracer()
+    app = setup_workflow_with_subgraph(tracer.trace_checkpointer(InMemorySaver()))
+    for i in range(4):
+        config = tracer.config({"configurable": {"thread_id": f"thread_{i}"}})
+        app.invoke(OuterGraphState(prompt="Please perform a sensitive_action now."), config)
+        state = app.get_state(config, subgraphs=True)
+        task = next(task for task in state.tasks if task.interrupts)
+        subgraph_state = SubgraphState.model_validate(task.state.values)  # type: ignore[union-attr]
+        subgraph_state.outer_graph_state.approved = True
+        app.update_state({"configurable": {"thread_id": f"thread_{i}", "checkpoint_ns": task.name}}, subgraph_state)
+        app.invoke(None, config)
+    # The Send fan-out from langgraph_send, whose branches run in parallel.
+    app = fan_out(8, tracer.trace_checkpointer(InMemorySaver()))
+    app.invoke(StartingState(chunks=8), tracer.config({"configurable": {"thread_id": "fan_out"}}))
+
+    # Sampled by the rate in each run's config: about half of these threads are traced.
+    sampled = GraphTracer()
+    app = setup_workflow_with_subgraph(sampled.trace_checkpointer(InMemorySaver()))
+    for i in range(20):
+        app.invoke(OuterGraphState(prompt="Nothing sensitive."), sampled.config({"configurable": {"thread_id": f"thread_{i}"}}, sample_rate=0.5))
+    print(f"sampled {len({span.thread_id for span in sampled.spans})} of 20 threads")
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "graph_trace.json"
+    tracer.export(path)
+    categories: dict[str, int] = {}
+    for event in tracer.events():
+        categories[event.get("cat", "metadata")] = categories.get(event.get("cat", "metadata"), 0) + 1
+    print(f"wrote {path}: {categories}; open it in https://ui.perfetto.dev")
@@ -0,0 +1,261 @@
+import asyncio
+import collections
+import functools
+import math
+import time
+import typing as t
+
+from agents.extensions.models.litellm_model import LitellmModel
+from agents.models.interface import Model
+
+
+class LatencyTracker:
+    """
+    Rolling window of call latencies and outcomes for one model. Cancelled hedge losers
+    contribute their elapsed time, which is a lower bound on what the call would have taken.
+    """
+
+    def __init__(self, window: int = 200):
+        self.latencies: collections.deque[float] = collections.deque(maxlen=window)
+        # True for a call that answered (or was cancelled), False for one that raised.
+        self.outcomes: collections.deque[bool] = collections.deque(maxlen=window)
+        self.failures = 0
+
+    def record(self, latency: float) -> None:
+        self.latencies.append(latency)
+        self.outcomes.append(True)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.outcomes.append(False)
+
+    def failure_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def percentile(self, pct: float) -> float | None:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+    def __repr__(self) -> str:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        fmt = lambda v: "n/a" if v is None else f"{v:.2f}s"
+        return f"LatencyTracker(samples={len(self.latencies)}, p50={fmt(p50)}, p95={fmt(p95)}, failures={self.failures})"
+
+
+class HedgedLitellmModel(Model):
+    """
+    A Model that can be used anywhere a LitellmModel is, and hedges slow requests.
+
+    The request goes to the primary model, which is the candidate with the lowest rolling p50
+    latency. If no response has arrived after the primary's rolling p95 latency, a duplicate
+    request is sent to the next-best candidate (or to the primary again if there is only one).
+    If the primary fails before then, the duplicate is sent right away. Whichever answers first
+    wins and the other request is cancelled. Until a model has `min_samples` latencies,
+    `default_hedge_delay` is used instead of its p95.
+    """
+
+    def __init__(
+        self,
+        models: t.Sequence[LitellmModel],
+        hedge_percentile: float = 95,
+        default_hedge_delay: float = 2.0,
+        min_hedge_delay: float = 0.25,
+        min_samples: int = 10,
+        window: int = 200,
+    ):
+        if not models:
+            raise ValueError("HedgedLitellmModel needs at least one model")
+        self.models = list(models)
+        self.hedge_percentile = hedge_percentile
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.min_samples = min_samples
+        self.stats: dict[str, LatencyTracker] = {model.model: LatencyTracker(window) for model in self.models}
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self._cleanups: set[asyncio.Future] = set()
+
+    def ranked_models(self) -> list[LitellmModel]:
+        """
+        Candidates ordered by rolling p50 divided by their rolling success rate, roughly the time
+        to a successful answer. Models without `min_samples` calls yet rank optimistically, in
+        configured order, so each one gets tried as primary before the stats settle. Models whose
+        every recent call failed rank last.
+        """
+        def rank(model: LitellmModel) -> tuple[float, float]:
+            tracker = self.stats[model.model]
+            failure_rate = tracker.failure_rate()
+            if failure_rate == 1:
+                # Every call in the window failed.
+                return math.inf, failure_rate
+            if len(tracker.outcomes) < self.min_samples:
+                return 0.0, failure_rate
+            return (tracker.percentile(50) or 0.0) / (1 - failure_rate), failure_rate
+        return sorted(self.models, key=rank)
+
+    def hedge_delay(self, model: LitellmModel) -> float:
+        tracker = self.stats[model.model]
+        if len(tracker.latencies) < self.min_samples:
+            return self.default_hedge_delay
+        return max(self.min_hedge_delay, tracker.percentile(self.hedge_percentile) or self.default_hedge_delay)
+
+    async def _timed(self, model: LitellmModel, call: t.Callable[[LitellmModel], t.Awaitable[t.Any]]) -> t.Any:
+        started = time.perf_counter()
+        try:
+            result = await call(model)
+        except asyncio.CancelledError:
+            # The loser of a hedge took at least this long; record it so slow models are ranked down.
+            self.stats[model.model].record(time.perf_counter() - started)
+            raise
+        except Exception:
+            self.stats[model.model].record_failure()
+            raise
+        self.stats[model.model].record(time.perf_counter() - started)
+        return result
+
+    async def _hedged(
+        self,
+        call: t.Callable[[LitellmModel], t.Awaitable[t.Any]],
+        discard: t.Callable[[t.Any], t.Awaitable[None]] | None = None,
+    ) -> t.Any:
+        """
+        Runs `call` hedged and returns the first result. `discard` is awaited with every other
+        result, including one that arrives in the same wakeup as the winner or despite the cancel.
+        """
+        ranked = self.ranked_models()
+        primary = ranked[0]
+        backup = ranked[1] if len(ranked) > 1 else primary
+
+        primary_task = asyncio.create_task(self._timed(primary, call))
+        hedge_task: asyncio.Task | None = None
+        tasks = [primary_task]
+        winner: asyncio.Task | None = None
+        try:
+            pending = {primary_task}
+            error: BaseException | None = None
+            while True:
+                # Only the primary runs against a deadline; once the backup is out, wait for either.
+                timeout = self.hedge_delay(primary) if hedge_task is None else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in tasks:
+                    if task in done and task.exception() is None:
+                        winner = task
+                        if task is hedge_task:
+                            self.hedges_won += 1
+                        return task.result()
+                for task in done:
+                    error = task.exception()
+                if hedge_task is None:
+                    # The primary is slow or has already failed: send the duplicate now.
+                    if not done:
+                        self.hedges_sent += 1
+                    hedge_task = asyncio.create_task(self._timed(backup, call))
+                    tasks.append(hedge_task)
+                    pending.add(hedge_task)
+                elif not pending:
+                    # Every request failed: surface the last error.
+                    raise error  # type: ignore[misc]
+        finally:
+            for task in tasks:
+                if task is not winner:
+                    task.cancel()
+                    if discard is not None:
+                        task.add_done_callback(functools.partial(self._discard, discard))
+
+    def _discard(self, discard: t.Callable[[t.Any], t.Awaitable[None]], task: asyncio.Task) -> None:
+        if task.cancelled() or task.exception() is not None:
+            return
+        cleanup = asyncio.ensure_future(discard(task.result()))
+        # The loop only keeps weak references to tasks.
+        self._cleanups.add(cleanup)
+        cleanup.add_done_callback(self._cleanups.discard)
+
+    async def get_response(self, *args: t.Any, **kwargs: t.Any):
+        return await self._hedged(lambda model: model.get_response(*args, **kwargs))
+
+    async def stream_response(self, *args: t.Any, **kwargs: t.Any):
+        """
+        Streams are hedged on their first event: whichever stream produces an event first is
+        followed to the end, and the other is closed, even if it produced its first event too.
+        """
+        async def first_event(model: LitellmModel) -> tuple[t.AsyncIterator[t.Any], t.Any]:
+            stream = model.stream_response(*args, **kwargs).__aiter__()
+            try:
+                return stream, await stream.__anext__()
+            except BaseException:
+                await stream.aclose()
+                raise
+
+        async def close(opened: tuple[t.AsyncIterator[t.Any], t.Any]) -> None:
+            await opened[0].aclose()  # type: ignore[attr-defined]
+
+        stream, event = await self._hedged(first_event, discard=close)
+        try:
+            yield event
+            async for event in stream:
+                yield event
+        finally:
+            await stream.aclose()
+
+
+if __name__ == "__main__":
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    from agents import Agent, Runner, set_tracing_disabled
+
+    # A local stand-in for an OpenAI-compatible endpoint with injectable per-model delays.
+    delays = {"slow": 3.0, "fast": 0.2}
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            model = body["model"]
+            time.sleep(delays.get(model, 0.0))
+            payload = json.dumps({
+                "id": "chatcmpl-standin",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": f"answered by {model}"}}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 3, "total_tokens": 13},
+            }).encode()
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # The hedged loser was cancelled.
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    set_tracing_disabled(True)
+    hedged = HedgedLitellmModel(
+        [LitellmModel(model="openai/slow", base_url=base_url, api_key="stand-in"),
+         LitellmModel(model="openai/fast", base_url=base_url, api_key="stand-in")],
+        default_hedge_delay=0.5,
+        min_samples=3,
+    )
+    agent = Agent(name="Assistant", instructions="Answer briefly.", model=hedged)
+
+    async def main():
+        for _ in range(6):
+            started = time.perf_counter()
+            result = await Runner.run(agent, "Hello?")
+            print(f"{result.final_output!r} in {time.perf_counter() - started:.2f}s")
+        print(f"hedges sent: {hedged.hedges_sent}, won: {hedged.hedges_won}")
+        for name, tracker in hedged.stats.items():
+            print(name, tracker)
+
+    asyncio.run(main())
+    server.shutdown()
@@ -0,0 +1,119 @@
+import json
+import math
+import typing as t
+
+from pydantic import BaseModel, ValidationError
+
+# Assistant messages may carry the form fields that had been validated as of that turn under this key.
+# It is never sent to the provider: compact() strips it and folds it into the facts record.
+FACTS_KEY = "facts"
+
+# Rough per-message framing overhead (role markers and separators) in tokens.
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Local token estimate, about 3.5 characters per token for English prose and JSON.
+    It errs high, which is the safe side for a budget, and needs no tokenizer download or API call.
+    """
+    return math.ceil(len(text) / 3.5)
+
+
+def message_text(message: dict[str, t.Any]) -> str:
+    content = message.get("content")
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+    return ""
+
+
+def estimate_message_tokens(messages: t.Iterable[dict[str, t.Any]]) -> int:
+    return sum(estimate_tokens(message_text(m)) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def validated_fields(model_cls: type[BaseModel], data: dict[str, t.Any]) -> dict[str, t.Any]:
+    """
+    Validates each field of `data` on its own and returns only the ones that pass, so a
+    partially correct form still contributes its good fields.
+    """
+    valid = {}
+    instance = model_cls.model_construct()
+    for name, value in data.items():
+        if name not in model_cls.model_fields:
+            continue
+        try:
+            model_cls.__pydantic_validator__.validate_assignment(instance, name, value)
+        except ValidationError:
+            continue
+        valid[name] = getattr(instance, name)
+    return valid
+
+
+class HistoryCompactor:
+    """
+    Keeps a multi-turn conversation under a token budget.
+
+    Leading system messages and the most recent messages are kept verbatim. When the whole history
+    does not fit, everything older is replaced by a single "facts collected so far" system block built
+    from the validated form fields recorded on earlier assistant turns. The cached system prompt stays
+    first, so the provider's prompt cache still applies.
+    """
+
+    def __init__(self, facts_model: type[BaseModel], token_budget: int = 8000, keep_recent_messages: int = 6):
+        self.facts_model = facts_model
+        self.token_budget = token_budget
+        self.keep_recent_messages = keep_recent_messages
+
+    def collect_facts(self, messages: t.Iterable[dict[str, t.Any]]) -> dict[str, t.Any]:
+        facts: dict[str, t.Any] = {}
+        for message in messages:
+            if message.get(FACTS_KEY):
+                facts.update(message[FACTS_KEY])
+        return validated_fields(self.facts_model, facts)
+
+    def facts_message(self, facts: dict[str, t.Any], folded_count: int) -> dict[str, t.Any]:
+        text = (
+            f"Facts collected so far from {folded_count} earlier messages. These are already validated; "
+            f"do not ask the user for them again:\n{json.dumps(facts, default=str)}"
+        )
+        return {"role": "system", "content": [{"type": "text", "text": text}]}
+
+    def compact(self, messages: list[dict[str, t.Any]]) -> list[dict[str, t.Any]]:
+        """
+        Returns the messages to send to the provider. The input list is not modified.
+        """
+        split = next((i for i, m in enumerate(messages) if m["role"] != "system"), len(messages))
+        system = messages[:split]
+        conversation = [{k: v for k, v in m.items() if k != FACTS_KEY} for m in messages[split:]]
+
+        if estimate_message_tokens(system) + estimate_message_tokens(conversation) <= self.token_budget:
+            return system + conversation
+
+        facts = self.collect_facts(messages)
+        recent_start = max(0, len(conversation) - self.keep_recent_messages)
+        while True:
+            # The first non-system message sent to Anthropic must come from the user.
+            while recent_start < len(conversation) - 1 and conversation[recent_start]["role"] != "user":
+                recent_start += 1
+            recent = conversation[recent_start:]
+            compacted = system + [self.facts_message(facts, recent_start)] + recent
+            if estimate_message_tokens(compacted) <= self.token_budget or len(recent) <= 1:
+                return compacted
+            recent_start += 1
+
+
+if __name__ == "__main__":
+    class Person(BaseModel):
+        first_name: str
+        last_name: str
+
+    compactor = HistoryCompactor(Person, token_budget=120, keep_recent_messages=2)
+    messages: list[dict[str, t.Any]] = [{"role": "system", "content": "Fill out the Person form."}]
+    for turn in range(10):
+        messages.append({"role": "user", "content": f"Turn {turn}: here is a rather long message with some detail in it."})
+        messages.append({"role": "assistant", "content": "What is your last name?", FACTS_KEY: {"first_name": "Bob"}})
+        compacted = compactor.compact(messages)
+        print(f"turn {turn}: {estimate_message_tokens(messages)} tokens of history -> {estimate_message_tokens(compacted)} sent")
+    print(json.dumps(compacted, indent=2))
@@ -0,0 +1,100 @@
+import json
+import pathlib
+import re
+import subprocess
+import sys
+import typing as t
+
+from pydantic import BaseModel
+
+ENTRY_POINTS = ["pydantic_test", "silly_test", "langgraph_interrupt_test"]
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+class ImportTiming(BaseModel):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+class ImportProfile(BaseModel):
+    entry_point: str
+    python_version: str
+    wall_seconds: float
+    total_us: int
+    timings: list[ImportTiming]
+
+    def top_level(self) -> list[ImportTiming]:
+        """
+        Imports made directly by the entry point, most expensive first. Their cumulative times add up
+        to the total, so this is where a lazy import pays off.
+        """
+        return sorted((timing for timing in self.timings if timing.depth == 1), key=lambda timing: timing.cumulative_us, reverse=True)
+
+    def by_package(self) -> dict[str, int]:
+        """
+        Self time summed per top-level package, wherever in the import tree it was first imported.
+        """
+        totals: dict[str, int] = {}
+        for timing in self.timings:
+            package = timing.module.split(".")[0]
+            totals[package] = totals.get(package, 0) + timing.self_us
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def profile_entry_point(entry_point: str, python: str = sys.executable, cwd: str | None = None) -> ImportProfile:
+    """
+    Imports `entry_point` in a fresh interpreter under `-X importtime`. Only module-level code runs;
+    the `__main__` block does not, so this measures exactly what every invocation pays before it
+    does any work.
+    """
+    code = f"import platform, time; started = time.perf_counter(); import {entry_point}; print(time.perf_counter() - started, platform.python_version())"
+    completed = subprocess.run([python, "-X", "importtime", "-c", code], capture_output=True, text=True, cwd=cwd, check=True)
+    timings = []
+    for line in completed.stderr.splitlines():
+        if match := _IMPORTTIME_LINE.match(line):
+            self_us, cumulative_us, indent, module = match.groups()
+            timings.append(ImportTiming(module=module, self_us=int(self_us), cumulative_us=int(cumulative_us), depth=len(indent) // 2))
+    # Lines are written when an import finishes, so the entry point's subtree is the run of deeper
+    # lines just before it. Anything earlier was imported by interpreter startup (site, .pth files).
+    end = max(i for i, timing in enumerate(timings) if timing.module == entry_point and timing.depth == 0)
+    start = end
+    while start > 0 and timings[start - 1].depth > 0:
+        start -= 1
+    wall_seconds, python_version = completed.stdout.strip().splitlines()[-1].split()
+    return ImportProfile(
+        entry_point=entry_point,
+        python_version=python_version,
+        wall_seconds=float(wall_seconds),
+        total_us=timings[end].cumulative_us,
+        timings=timings[start:end],
+    )
+
+
+def print_profile(profile: ImportProfile, top: int = 10) -> None:
+    print(f"{profile.entry_point} on Python {profile.python_version}: {profile.total_us / 1e3:.0f} ms to import ({profile.wall_seconds * 1e3:.0f} ms wall)")
+    for timing in profile.top_level()[:top]:
+        print(f"  {timing.cumulative_us / 1e3:8.1f} ms  {timing.module}")
+    packages = list(profile.by_package().items())[:top]
+    print("  by package: " + ", ".join(f"{package} {us / 1e3:.0f} ms" for package, us in packages))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Record -X importtime breakdowns for the entry-point scripts")
+    parser.add_argument("entry_points", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("--runs", type=int, default=3, help="Keep the fastest of this many runs")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--output", type=pathlib.Path, help="Write the profiles to this JSON file")
+    args = parser.parse_args()
+
+    profiles: dict[str, t.Any] = {}
+    for entry_point in args.entry_points:
+        profile = min((profile_entry_point(entry_point) for _ in range(args.runs)), key=lambda profile: profile.total_us)
+        print_profile(profile, top=args.top)
+        profiles[entry_point] = profile.model_dump()
+    if args.output:
+        args.output.write_text(json.dumps(profiles, indent=2))
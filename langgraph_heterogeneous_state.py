@@ -5,6 +5,8 @@ from pydantic import BaseModel
 from langgraph.graph import END, StateGraph
 from langchain_core.runnables import RunnableConfig
 
+from generic_warmup import warm_up
+
 import typing as t
 
 
@@ -43,6 +45,8 @@ def adapt_node_to_channel[TIn: BaseModel, TOut: BaseModel](
         output_data = node(input_data)
         return { output_channel_name: output_data.model_dump() }
     
+    # The wrapper only takes a dict, so expose the declared types for generic_warmup.
+    wrapper.node_types = (input_type, output_type)
     return wrapper
 
 def langgraph_pydantic_node[TIn: BaseModel, TOut: BaseModel](
@@ -114,6 +118,7 @@ def workflow_test():
     # compile graph with in-memory checkpointer
     checkpointer = InMemorySaver(serde=JsonPlusSerializer())
     app = graph.compile(checkpointer=checkpointer)
+    print(warm_up(app))
     
     config: RunnableConfig = {"configurable": {"thread_id": "test_run_1"}}
    
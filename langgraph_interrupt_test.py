@@ -16,6 +16,9 @@ import pprint
 
 from deepmerge import always_merger
 
+from checkpoint_models import ModelSerializer
+from graph_cache import cached_compile
+
 
 class SomeStuff(BaseModel):
     query: str
@@ -116,7 +119,7 @@ class SubgraphState(BaseModel):
     times_pre_step_was_run: int = 0
     times_post_step_was_run: int = 0
 
-def setup_workflow_with_subgraph() -> CompiledStateGraph:
+def setup_workflow_with_subgraph(checkpointer: BaseCheckpointSaver | None = None) -> CompiledStateGraph:
     def do_something(state: OuterGraphState) -> OuterGraphState:
         state.times_that_something_was_done += 1
         return state
@@ -151,7 +154,7 @@ def setup_workflow_with_subgraph() -> CompiledStateGraph:
     subgraph.set_entry_point("pre_step")
     subgraph.add_edge("post_step", END)
     
-    workflow.add_node("subgraph", subgraph.compile(checkpointer=True))
+    workflow.add_node("subgraph", cached_compile(subgraph, checkpointer=True))
     workflow.add_edge("do_something", "subgraph")
     workflow.set_entry_point("do_something")
     workflow.add_edge("subgraph", END)
@@ -163,9 +166,12 @@ def setup_workflow_with_subgraph() -> CompiledStateGraph:
     # conn = sqlite3.connect(db_path, check_same_thread=False)
     # checkpointer = SqliteSaver(conn)
     
-    checkpointer=InMemorySaver(serde=JsonPlusSerializer())
+    if checkpointer is None:
+        # The subgraph's outer_graph_state channel holds an OuterGraphState; load it straight from its JSON.
+        # A saver made here is new on every call, so caching would only pin it and its checkpoints.
+        return workflow.compile(checkpointer=InMemorySaver(serde=ModelSerializer(OuterGraphState, SubgraphState)))
 
-    return workflow.compile(checkpointer=checkpointer)
+    return cached_compile(workflow, checkpointer=checkpointer)
 
 def test_langgraph_with_interrupt_in_subgraph():
     app = setup_workflow_with_subgraph()
@@ -303,6 +309,8 @@ def test_langgraph_direct_pydantic_subgraph():
         graph.add_edge("final_node", END)
         graph.set_entry_point("before_subgraph_node")
         
+        # Not cached_compile: the saver is made per test, and the nodes close over this test's
+        # do_interrupt, so no two calls build the same graph.
         return graph.compile(checkpointer=checkpointer)
     
     def do_test(checkpointer: BaseCheckpointSaver):
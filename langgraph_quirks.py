@@ -5,6 +5,8 @@ from pydantic import BaseModel
 from langgraph.graph import END, StateGraph
 from langchain_core.runnables import RunnableConfig
 
+from failure_log import FailureLog, record_failures
+
 class Foo(BaseModel):
     foo_field: str
     
@@ -47,11 +49,13 @@ def linear_pydantic_graph_with_crash_recovery() -> None:
     graph = StateGraph(state_schema=Foo, input_schema=Foo, output_schema=Blat)
     
     kaboom = False
+    failures = FailureLog()
     
     def first_node(state: Foo) -> Bar:
         print("First node executing")
         return Bar(bar_field=len(state.foo_field))
 
+    @record_failures(failures)
     def second_node(state: Bar) -> Baz:
         print("Second node executing")
         nonlocal kaboom
@@ -83,6 +87,8 @@ def linear_pydantic_graph_with_crash_recovery() -> None:
         app.invoke(input=Foo(foo_field="hello"), config=config)
     except RuntimeError as e:
         print(f"Caught expected error: {e}")
+    failure = failures.recent(node="second_node")[0]
+    print(f"Recorded failure at checkpoint {failure.checkpoint_id} of thread {failure.thread_id}:\n{failure.format()}")
         
     # Note input=None. The checkpointer will restore the state.
     kaboom = False
@@ -0,0 +1,77 @@
+import importlib
+import sys
+import threading
+import time
+import types
+import typing as t
+
+_load_times: dict[str, float] = {}
+_lock = threading.Lock()
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stands in for a module until one of its attributes is first used, then imports it and takes
+    over its namespace, so later lookups are plain attribute reads.
+
+    Unlike importlib.util.LazyLoader this also defers importing the parent packages, which is where
+    most of the cost is for things like `agents.extensions.models.litellm_model`.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_loaded"] = False
+
+    def _load(self) -> None:
+        with _lock:
+            if self.__dict__["_lazy_loaded"]:
+                return
+            started = time.perf_counter()
+            module = importlib.import_module(self.__name__)
+            _load_times[self.__name__] = time.perf_counter() - started
+            self.__dict__.update(module.__dict__)
+            self.__dict__["_lazy_loaded"] = True
+
+    def __getattr__(self, name: str) -> t.Any:
+        # Only called for names not in __dict__, i.e. before loading or for missing attributes.
+        if self.__dict__["_lazy_loaded"]:
+            raise AttributeError(f"module {self.__name__!r} has no attribute {name!r}")
+        self._load()
+        return getattr(self, name)
+
+    def __dir__(self) -> list[str]:
+        self._load()
+        return list(self.__dict__)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_loaded"] else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    Returns the module if it is already imported, otherwise a LazyModule that imports it on first
+    attribute access. Use it at module top in place of `import name`:
+
+        anthropic = lazy_import("anthropic")
+        litellm_model = lazy_import("agents.extensions.models.litellm_model")
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+def lazy_load_times() -> dict[str, float]:
+    """
+    Seconds spent importing each lazily imported module, in the order they were first used.
+    """
+    return dict(_load_times)
+
+
+if __name__ == "__main__":
+    decimal = lazy_import("decimal")
+    print(decimal, "decimal" in sys.modules)
+    print(decimal.Decimal("1.10") + decimal.Decimal("2.20"), decimal)
+    print(f"already imported modules are returned as is: {lazy_import('threading') is threading}")
+    print(lazy_load_times())
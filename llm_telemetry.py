@@ -0,0 +1,390 @@
+import contextlib
+import contextvars
+import functools
+import inspect
+import math
+import sqlite3
+import statistics
+import threading
+import time
+import typing as t
+import uuid
+
+from pydantic import BaseModel, Field
+
+from prompt_cache import PromptCacheUsage
+
+if t.TYPE_CHECKING:
+    from langchain_core.outputs import LLMResult
+
+_current_prompt: contextvars.ContextVar[str | None] = contextvars.ContextVar("telemetry_prompt", default=None)
+
+
+@contextlib.contextmanager
+def telemetry_prompt(prompt_id: str) -> t.Iterator[None]:
+    """
+    Labels every LLM call made inside the block with `prompt_id`, for rollups by prompt.
+    """
+    token = _current_prompt.set(prompt_id)
+    try:
+        yield
+    finally:
+        _current_prompt.reset(token)
+
+
+class LLMCallRecord(BaseModel):
+    call_id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    started_at: float
+    framework: str
+    model: str
+    prompt_id: str | None = Field(default_factory=_current_prompt.get)
+    latency_seconds: float
+    time_to_first_token_seconds: float | None = None
+    usage: PromptCacheUsage = Field(default_factory=PromptCacheUsage)
+    attempts: int = 1
+    success: bool = True
+    error: str | None = None
+
+    @property
+    def retries(self) -> int:
+        return max(0, self.attempts - 1)
+
+
+class RollupRow(BaseModel):
+    model: str
+    prompt_id: str | None
+    calls: int
+    errors: int
+    retries: int
+    p50_latency_seconds: float
+    p95_latency_seconds: float
+    mean_ttft_seconds: float | None
+    input_tokens: int
+    cache_read_input_tokens: int
+    cache_creation_input_tokens: int
+    output_tokens: int
+
+
+class TelemetrySink:
+    """
+    Stores one row per LLM call in a local SQLite database, and rolls them up by model and prompt.
+    """
+
+    def __init__(self, db_path: str = "./llm_telemetry.db"):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_calls (
+                    call_id TEXT PRIMARY KEY,
+                    started_at REAL NOT NULL,
+                    framework TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    prompt_id TEXT,
+                    latency_seconds REAL NOT NULL,
+                    time_to_first_token_seconds REAL,
+                    input_tokens INTEGER NOT NULL,
+                    output_tokens INTEGER NOT NULL,
+                    cache_read_input_tokens INTEGER NOT NULL,
+                    cache_creation_input_tokens INTEGER NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    success INTEGER NOT NULL,
+                    error TEXT
+                )
+                """
+            )
+
+    def write(self, record: LLMCallRecord) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO llm_calls VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record.call_id, record.started_at, record.framework, record.model, record.prompt_id,
+                    record.latency_seconds, record.time_to_first_token_seconds,
+                    record.usage.input_tokens, record.usage.output_tokens,
+                    record.usage.cache_read_input_tokens, record.usage.cache_creation_input_tokens,
+                    record.attempts, int(record.success), record.error,
+                ),
+            )
+
+    def rollup(self, since: float = 0.0) -> list[RollupRow]:
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT model, prompt_id, latency_seconds, time_to_first_token_seconds, attempts, success,
+                       input_tokens, cache_read_input_tokens, cache_creation_input_tokens, output_tokens
+                FROM llm_calls WHERE started_at >= ? ORDER BY model, prompt_id
+                """,
+                (since,),
+            ).fetchall()
+        groups: dict[tuple[str, str | None], list[tuple]] = {}
+        for row in rows:
+            groups.setdefault((row[0], row[1]), []).append(row)
+        result = []
+        for (model, prompt_id), group in groups.items():
+            latencies = sorted(row[2] for row in group)
+            ttfts = [row[3] for row in group if row[3] is not None]
+            result.append(RollupRow(
+                model=model,
+                prompt_id=prompt_id,
+                calls=len(group),
+                errors=sum(1 for row in group if not row[5]),
+                retries=sum(row[4] - 1 for row in group),
+                p50_latency_seconds=percentile(latencies, 50),
+                p95_latency_seconds=percentile(latencies, 95),
+                mean_ttft_seconds=statistics.fmean(ttfts) if ttfts else None,
+                input_tokens=sum(row[6] for row in group),
+                cache_read_input_tokens=sum(row[7] for row in group),
+                cache_creation_input_tokens=sum(row[8] for row in group),
+                output_tokens=sum(row[9] for row in group),
+            ))
+        return result
+
+
+def percentile(sorted_values: t.Sequence[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile.
+    index = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class _InstructorCall:
+    def __init__(self):
+        self.attempts = 0
+        self.usage = PromptCacheUsage()
+
+
+def instrument_instructor[C](client: C, sink: TelemetrySink, framework: str = "instructor") -> C:
+    """
+    Records one LLMCallRecord per `create`/`create_with_completion` call on an instructor client
+    (sync or async), including how many attempts `max_retries` actually used and the token usage
+    summed over all of them. Returns the same client.
+    """
+    current_call: contextvars.ContextVar[_InstructorCall | None] = contextvars.ContextVar("instructor_call", default=None)
+
+    def on_response(response: t.Any) -> None:
+        call = current_call.get()
+        if call is None:
+            return
+        call.attempts += 1
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            # Anthropic clients report input_tokens; OpenAI-style clients (e.g. instructor over LiteLLM) prompt_tokens.
+            call.usage += PromptCacheUsage.from_anthropic(usage) if getattr(usage, "input_tokens", None) is not None else litellm_usage(usage)
+
+    def on_error(error: Exception) -> None:
+        call = current_call.get()
+        if call is not None and call.attempts == 0:
+            call.attempts = 1
+
+    client.on("completion:response", on_response)  # type: ignore[attr-defined]
+    client.on("completion:error", on_error)  # type: ignore[attr-defined]
+
+    def finish(call: _InstructorCall, started_at: float, started: float, kwargs: dict, error: BaseException | None) -> None:
+        sink.write(LLMCallRecord(
+            started_at=started_at,
+            framework=framework,
+            model=str(kwargs.get("model", "unknown")),
+            latency_seconds=time.perf_counter() - started,
+            usage=call.usage,
+            attempts=max(call.attempts, 1),
+            success=error is None,
+            error=None if error is None else f"{type(error).__name__}: {error}",
+        ))
+
+    def wrap(method: t.Callable[..., t.Any]) -> t.Callable[..., t.Any]:
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(*args: t.Any, **kwargs: t.Any) -> t.Any:
+                call, started_at, started = _InstructorCall(), time.time(), time.perf_counter()
+                token = current_call.set(call)
+                try:
+                    result = await method(*args, **kwargs)
+                except BaseException as e:
+                    finish(call, started_at, started, kwargs, e)
+                    raise
+                finally:
+                    current_call.reset(token)
+                finish(call, started_at, started, kwargs, None)
+                return result
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(*args: t.Any, **kwargs: t.Any) -> t.Any:
+            call, started_at, started = _InstructorCall(), time.time(), time.perf_counter()
+            token = current_call.set(call)
+            try:
+                result = method(*args, **kwargs)
+            except BaseException as e:
+                finish(call, started_at, started, kwargs, e)
+                raise
+            finally:
+                current_call.reset(token)
+            finish(call, started_at, started, kwargs, None)
+            return result
+        return wrapper
+
+    # client.chat.completions is the client itself, so patching the instance covers every spelling.
+    client.create = wrap(client.create)  # type: ignore[attr-defined]
+    client.create_with_completion = wrap(client.create_with_completion)  # type: ignore[attr-defined]
+    return client
+
+
+@functools.cache
+def _langchain_handler_class() -> type:
+    # Defined on first use so that importing this module does not import LangChain.
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class LangChainTelemetryHandler(BaseCallbackHandler):
+        """
+        LangChain callback handler that records every chat model call, e.g. the LLM steps of
+        `create_react_agent`. Pass it in `config={"callbacks": [handler]}`. Time to first token is
+        only known when the model streams.
+        """
+
+        def __init__(self, sink: TelemetrySink, framework: str = "langchain"):
+            self.sink = sink
+            self.framework = framework
+            self._runs: dict[uuid.UUID, dict[str, t.Any]] = {}
+
+        def on_chat_model_start(self, serialized: dict[str, t.Any], messages: t.Any, *, run_id: uuid.UUID, metadata: dict[str, t.Any] | None = None, **kwargs: t.Any) -> None:
+            model = (metadata or {}).get("ls_model_name") or serialized.get("kwargs", {}).get("model") or serialized.get("name", "unknown")
+            self._runs[run_id] = {
+                "model": str(model),
+                "prompt_id": _current_prompt.get(),
+                "started_at": time.time(),
+                "started": time.perf_counter(),
+                "first_token": None,
+            }
+
+        def on_llm_new_token(self, token: str, *, run_id: uuid.UUID, **kwargs: t.Any) -> None:
+            run = self._runs.get(run_id)
+            if run is not None and run["first_token"] is None:
+                run["first_token"] = time.perf_counter()
+
+        def _finish(self, run_id: uuid.UUID, usage: PromptCacheUsage, error: BaseException | None) -> None:
+            run = self._runs.pop(run_id, None)
+            if run is None:
+                return
+            self.sink.write(LLMCallRecord(
+                started_at=run["started_at"],
+                framework=self.framework,
+                model=run["model"],
+                prompt_id=run["prompt_id"],
+                latency_seconds=time.perf_counter() - run["started"],
+                time_to_first_token_seconds=None if run["first_token"] is None else run["first_token"] - run["started"],
+                usage=usage,
+                success=error is None,
+                error=None if error is None else f"{type(error).__name__}: {error}",
+            ))
+
+        def on_llm_end(self, response: "LLMResult", *, run_id: uuid.UUID, **kwargs: t.Any) -> None:
+            usage = PromptCacheUsage()
+            for generations in response.generations:
+                for generation in generations:
+                    message = getattr(generation, "message", None)
+                    if message is not None:
+                        usage += PromptCacheUsage.from_langchain(message)
+            self._finish(run_id, usage, None)
+
+        def on_llm_error(self, error: BaseException, *, run_id: uuid.UUID, **kwargs: t.Any) -> None:
+            self._finish(run_id, PromptCacheUsage(), error)
+
+    return LangChainTelemetryHandler
+
+
+def __getattr__(name: str) -> t.Any:
+    if name == "LangChainTelemetryHandler":
+        return _langchain_handler_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def litellm_usage(usage: t.Any) -> PromptCacheUsage:
+    """
+    LiteLLM reports OpenAI-style usage: prompt_tokens includes cached tokens, which are broken out
+    in prompt_tokens_details (and cache_creation_input_tokens for Anthropic).
+    """
+    if usage is None:
+        return PromptCacheUsage()
+    details = getattr(usage, "prompt_tokens_details", None)
+    cache_read = (getattr(details, "cached_tokens", None) if details else None) or getattr(usage, "cache_read_input_tokens", 0) or 0
+    cache_creation = getattr(usage, "cache_creation_input_tokens", 0) or 0
+    return PromptCacheUsage(
+        input_tokens=max(0, (usage.prompt_tokens or 0) - cache_read - cache_creation),
+        output_tokens=usage.completion_tokens or 0,
+        cache_read_input_tokens=cache_read,
+        cache_creation_input_tokens=cache_creation,
+    )
+
+
+@functools.cache
+def install_litellm_telemetry(sink: TelemetrySink) -> t.Any:
+    """
+    Registers a LiteLLM logger that records every LiteLLM call, which covers `LitellmModel` inside
+    openai-agents `Runner.run` even with tracing disabled. Safe to call repeatedly.
+    """
+    import litellm
+    from litellm.integrations.custom_logger import CustomLogger
+
+    class LiteLLMTelemetryLogger(CustomLogger):
+        def _record(self, kwargs: dict[str, t.Any], response_obj: t.Any, start_time: t.Any, end_time: t.Any, success: bool) -> None:
+            first_token = kwargs.get("completion_start_time")
+            exception = kwargs.get("exception")
+            sink.write(LLMCallRecord(
+                started_at=start_time.timestamp(),
+                framework="litellm",
+                model=str(kwargs.get("model", "unknown")),
+                latency_seconds=(end_time - start_time).total_seconds(),
+                time_to_first_token_seconds=(first_token - start_time).total_seconds() if first_token and kwargs.get("stream") else None,
+                usage=litellm_usage(getattr(response_obj, "usage", None)) if success else PromptCacheUsage(),
+                success=success,
+                error=None if success else f"{type(exception).__name__}: {exception}",
+            ))
+
+        def log_success_event(self, kwargs, response_obj, start_time, end_time):
+            self._record(kwargs, response_obj, start_time, end_time, True)
+
+        def log_failure_event(self, kwargs, response_obj, start_time, end_time):
+            self._record(kwargs, response_obj, start_time, end_time, False)
+
+        async def async_log_success_event(self, kwargs, response_obj, start_time, end_time):
+            self._record(kwargs, response_obj, start_time, end_time, True)
+
+        async def async_log_failure_event(self, kwargs, response_obj, start_time, end_time):
+            self._record(kwargs, response_obj, start_time, end_time, False)
+
+    logger = LiteLLMTelemetryLogger()
+    litellm.callbacks.append(logger)
+    return logger
+
+
+@functools.cache
+def default_sink() -> TelemetrySink:
+    return TelemetrySink()
+
+
+def print_rollup(sink: TelemetrySink, since: float = 0.0) -> None:
+    for row in sink.rollup(since):
+        ttft = "n/a" if row.mean_ttft_seconds is None else f"{row.mean_ttft_seconds:.2f}s"
+        print(
+            f"{row.model} [{row.prompt_id or '-'}]: {row.calls} calls, {row.errors} errors, {row.retries} retries, "
+            f"p50 {row.p50_latency_seconds:.2f}s, p95 {row.p95_latency_seconds:.2f}s, ttft {ttft}, "
+            f"tokens in/cache_read/cache_write/out {row.input_tokens}/{row.cache_read_input_tokens}/"
+            f"{row.cache_creation_input_tokens}/{row.output_tokens}"
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Roll up recorded LLM calls by model and prompt.")
+    parser.add_argument("db_path", nargs="?", default="./llm_telemetry.db")
+    parser.add_argument("--hours", type=float, default=None, help="Only include calls from the last N hours")
+    args = parser.parse_args()
+
+    since = time.time() - args.hours * 3600 if args.hours else 0.0
+    print_rollup(TelemetrySink(args.db_path), since)
@@ -0,0 +1,101 @@
+import functools
+import typing as t
+
+from pydantic import BaseModel, ValidationError
+from pydantic_core import from_json
+
+from pydantic_make_optional import make_all_fields_optional
+
+
+def partial_model(model_cls: type[BaseModel]) -> type[BaseModel]:
+    """
+    A lenient copy of `model_cls` for validating incomplete JSON: every field is optional,
+    nested models are optional too, and the original validators are dropped so that
+    half-streamed values (e.g. "Bo" on its way to "Bob Smith") are not rejected.
+    """
+    return make_all_fields_optional(model_cls, recursive=True, keep_validators=False)
+
+
+class PartialJsonStream[T: BaseModel]:
+    """
+    Incrementally parses streamed JSON for `model_cls`.
+
+    Each fragment is appended to a buffer that is re-parsed with pydantic_core's partial mode. Strings that
+    are still streaming are included, so text fields can be shown while they are being generated.
+    If a truncated string makes the partial invalid (say, half of a Literal), the parse falls back
+    to only the values that are complete. Call `final()` once the stream ends for full validation.
+    """
+
+    def __init__(self, model_cls: type[T]):
+        self.model_cls = model_cls
+        self.partial_cls = partial_model(model_cls)
+        self.buffer = ""
+        self.latest: BaseModel | None = None
+
+    def _parse(self, partial_mode: t.Literal["on", "trailing-strings"]) -> BaseModel | None:
+        try:
+            return self.partial_cls.model_validate(from_json(self.buffer.encode(), allow_partial=partial_mode))
+        except (ValueError, ValidationError):
+            return None
+
+    def feed(self, fragment: str) -> BaseModel | None:
+        """
+        Adds a fragment and returns the new partial object, or None if nothing changed.
+        """
+        if not fragment:
+            return None
+        self.buffer += fragment
+        partial = self._parse("trailing-strings") or self._parse("on")
+        if partial is None or partial == self.latest:
+            return None
+        self.latest = partial
+        return partial
+
+    def final(self) -> T:
+        return self.model_cls.model_validate_json(self.buffer)
+
+
+class TextFieldDelta:
+    """
+    Tracks one string field across partial objects and returns only the newly streamed text.
+    """
+
+    def __init__(self, field_name: str):
+        self.field_name = field_name
+        self.seen = ""
+
+    def __call__(self, partial: BaseModel) -> str:
+        value = getattr(partial, self.field_name, None) or ""
+        if not value.startswith(self.seen):
+            self.seen = ""
+        delta = value[len(self.seen):]
+        self.seen = value
+        return delta
+
+
+@functools.cache
+def anthropic_tool_for(model_cls: type[BaseModel]) -> dict[str, t.Any]:
+    return {
+        "name": model_cls.__name__,
+        "description": (model_cls.__doc__ or f"Respond with a {model_cls.__name__}.").strip(),
+        "input_schema": model_cls.model_json_schema(),
+    }
+
+
+if __name__ == "__main__":
+    class Inner(BaseModel):
+        name: str
+
+    class Outer(BaseModel):
+        status: t.Literal["SUCCESS", "USER_INPUT_NEEDED"]
+        inner: Inner | None = None
+        user_prompt: str | None = None
+
+    payload = '{"status": "USER_INPUT_NEEDED", "inner": {"name": "Bo"}, "user_prompt": "What is your last name?"}'
+    stream = PartialJsonStream(Outer)
+    user_prompt = TextFieldDelta("user_prompt")
+    for i in range(0, len(payload), 7):
+        partial = stream.feed(payload[i:i + 7])
+        if partial is not None:
+            print(f"partial: {partial!r} | new user_prompt text: {user_prompt(partial)!r}")
+    print(f"final: {stream.final()!r}")
@@ -0,0 +1,143 @@
+import functools
+import json
+import typing as t
+
+from pydantic import BaseModel
+
+from lazy_imports import lazy_import
+
+if t.TYPE_CHECKING:
+    from langchain_core.messages import BaseMessage, SystemMessage
+
+langchain_messages = lazy_import("langchain_core.messages")
+
+SCHEMA_PLACEHOLDER = "{schema}"
+
+
+@functools.cache
+def model_json_schema_text(model_cls: type[BaseModel]) -> str:
+    """
+    Returns the pretty-printed JSON schema for a model, computed on first use and memoized per class.
+    """
+    return json.dumps(model_cls.model_json_schema(), indent=2)
+
+
+class CachedPrompt:
+    """
+    A system prompt that is rendered lazily and can be marked for Anthropic prompt caching.
+
+    If the template contains a {schema} placeholder, it is replaced by the schema of `schema_model`
+    the first time the prompt text is needed, never at import time. The rendered text is the stable
+    prefix of every turn, so it is marked with `cache_control` and the provider can reuse it instead
+    of prefilling it again. Note that Anthropic only caches prefixes above a minimum size
+    (1024 tokens for Sonnet), so small prompts will report no cache hits.
+    """
+
+    def __init__(self, template: str, schema_model: type[BaseModel] | None = None):
+        self.template = template
+        self.schema_model = schema_model
+
+    @functools.cached_property
+    def text(self) -> str:
+        if self.schema_model is None:
+            return self.template
+        return self.template.replace(SCHEMA_PLACEHOLDER, model_json_schema_text(self.schema_model))
+
+    def __str__(self) -> str:
+        return self.text
+
+    def anthropic_system_blocks(self) -> list[dict[str, t.Any]]:
+        """
+        System content blocks for the Anthropic messages API (and instructor), with a cache breakpoint.
+        """
+        return [{"type": "text", "text": self.text, "cache_control": {"type": "ephemeral"}}]
+
+    def langchain_system_message(self) -> "SystemMessage":
+        """
+        A LangChain SystemMessage carrying the same cache breakpoint, for ChatAnthropic based agents.
+        """
+        return langchain_messages.SystemMessage(content=self.anthropic_system_blocks())
+
+
+class PromptCacheUsage(BaseModel):
+    """
+    Token usage for one LLM call, split into uncached input, cache reads and cache writes.
+    """
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+
+    @property
+    def total_input_tokens(self) -> int:
+        return self.input_tokens + self.cache_read_input_tokens + self.cache_creation_input_tokens
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        total = self.total_input_tokens
+        return self.cache_read_input_tokens / total if total else 0.0
+
+    def __add__(self, other: "PromptCacheUsage") -> "PromptCacheUsage":
+        return PromptCacheUsage(
+            input_tokens=self.input_tokens + other.input_tokens,
+            output_tokens=self.output_tokens + other.output_tokens,
+            cache_read_input_tokens=self.cache_read_input_tokens + other.cache_read_input_tokens,
+            cache_creation_input_tokens=self.cache_creation_input_tokens + other.cache_creation_input_tokens,
+        )
+
+    @classmethod
+    def from_anthropic(cls, usage: t.Any) -> "PromptCacheUsage":
+        """
+        Builds usage from an `anthropic.types.Usage`. Anthropic already reports uncached input separately.
+        """
+        return cls(
+            input_tokens=usage.input_tokens or 0,
+            output_tokens=usage.output_tokens or 0,
+            cache_read_input_tokens=getattr(usage, "cache_read_input_tokens", None) or 0,
+            cache_creation_input_tokens=getattr(usage, "cache_creation_input_tokens", None) or 0,
+        )
+
+    @classmethod
+    def from_langchain(cls, message: "BaseMessage") -> "PromptCacheUsage":
+        """
+        Builds usage from a LangChain AIMessage. LangChain folds cached tokens into input_tokens,
+        so they are subtracted back out here.
+        """
+        if not isinstance(message, langchain_messages.AIMessage) or not message.usage_metadata:
+            return cls()
+        usage = message.usage_metadata
+        details = usage.get("input_token_details", {}) or {}
+        cache_read = details.get("cache_read", 0) or 0
+        cache_creation = details.get("cache_creation", 0) or 0
+        return cls(
+            input_tokens=usage["input_tokens"] - cache_read - cache_creation,
+            output_tokens=usage["output_tokens"],
+            cache_read_input_tokens=cache_read,
+            cache_creation_input_tokens=cache_creation,
+        )
+
+
+def report_cache_usage(label: str, usage: PromptCacheUsage) -> None:
+    print(
+        f"[{label}] input={usage.input_tokens} cache_read={usage.cache_read_input_tokens} "
+        f"cache_write={usage.cache_creation_input_tokens} output={usage.output_tokens} "
+        f"hit_ratio={usage.cache_hit_ratio:.0%}"
+    )
+
+
+if __name__ == "__main__":
+    class Foo(BaseModel):
+        foo_field: str
+
+    prompt = CachedPrompt("Fill out this form.\n\n```json\n{schema}\n```", Foo)
+    print(prompt.anthropic_system_blocks())
+    assert model_json_schema_text(Foo) is model_json_schema_text(Foo)
+
+    class FakeUsage(BaseModel):
+        input_tokens: int
+        output_tokens: int
+        cache_read_input_tokens: int | None = None
+        cache_creation_input_tokens: int | None = None
+
+    report_cache_usage("first turn", PromptCacheUsage.from_anthropic(FakeUsage(input_tokens=20, output_tokens=50, cache_creation_input_tokens=1500)))
+    report_cache_usage("second turn", PromptCacheUsage.from_anthropic(FakeUsage(input_tokens=40, output_tokens=50, cache_read_input_tokens=1500)))
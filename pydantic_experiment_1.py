@@ -59,6 +59,13 @@ print(user.model_dump())
 # Override with exclude=set() - includes all fields, including nested excluded ones
 print(user.model_dump(include={'address': {'postal_code': True, 'city': True}}, exclude=set()))
 
+# Without the hack: a precompiled projection includes postal_code because the mask names it.
+from field_mask import projection
+
+address_view = projection(User, "name", "address.city", "address.postal_code")
+print(address_view.dump(user))
+print(address_view.dump_json(user))
+
 print(user.model_dump(round_trip=True))
 
 user2 = User.model_validate(user.model_dump(round_trip=True))
@@ -1,35 +1,144 @@
-from typing import Optional, get_type_hints
-from pydantic import BaseModel, create_model
+import inspect
+import threading
+import types
+import typing as t
+from typing import Optional
+from pydantic import BaseModel, create_model, field_validator
+from pydantic.fields import FieldInfo
 
-def make_all_fields_optional(model_cls: type[BaseModel]) -> type[BaseModel]:
+_optional_models: dict[tuple[type[BaseModel], bool, bool], type[BaseModel]] = {}
+_optional_models_lock = threading.RLock()
+_in_progress: set[tuple[type[BaseModel], bool, bool]] = set()
+
+def make_all_fields_optional(
+    model_cls: type[BaseModel],
+    *,
+    recursive: bool = False,
+    keep_validators: bool = True,
+) -> type[BaseModel]:
     """
     Return a new Pydantic model class with all fields made Optional,
     without modifying the original class.
+
+    The derived class is cached, so the same source model and options always return the same
+    class and repeated calls cost a dictionary lookup. With `recursive`, nested models (including
+    ones inside lists, dicts, unions and parametrized generics) are made optional too.
+
+    With `keep_validators` the derived class subclasses the original, so it keeps its config,
+    model validators and methods; field validators are re-declared to let None through, since
+    None is now a valid value for every field. Without it, only the config is carried over.
     """
-    # Resolve type hints (so ForwardRefs, etc. are handled)
-    annotations = get_type_hints(model_cls, include_extras=True)
+    key = (model_cls, recursive, keep_validators)
+    derived = _optional_models.get(key)
+    if derived is not None:
+        return derived
+    with _optional_models_lock:
+        derived = _optional_models.get(key)
+        if derived is None:
+            _in_progress.add(key)
+            try:
+                derived = _optional_models[key] = _derive_optional_model(model_cls, recursive, keep_validators)
+            finally:
+                _in_progress.discard(key)
+        return derived
+
+def _optional_annotation(annotation: t.Any, recursive: bool, keep_validators: bool) -> t.Any:
+    if not recursive:
+        return annotation
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        if (annotation, recursive, keep_validators) in _in_progress:
+            # Self-referencing model: leave the reference to the original class.
+            return annotation
+        return make_all_fields_optional(annotation, recursive=recursive, keep_validators=keep_validators)
+    origin = t.get_origin(annotation)
+    if origin is None or origin is t.Literal:
+        return annotation
+    args = t.get_args(annotation)
+    if origin is t.Annotated:
+        return t.Annotated[(_optional_annotation(args[0], recursive, keep_validators), *args[1:])]
+    new_args = tuple(_optional_annotation(arg, recursive, keep_validators) for arg in args)
+    if origin in (t.Union, types.UnionType):
+        return t.Union[new_args]
+    return origin[new_args]
+
+def _none_tolerant(validator: t.Callable[..., t.Any]) -> t.Callable[..., t.Any]:
+    # Match the original's arity, since Pydantic decides what to pass by inspecting the signature.
+    arity = len(inspect.signature(validator).parameters)
+    if arity == 1:
+        def wrapper(cls, value):
+            return value if value is None else validator(value)
+    elif arity == 2:
+        def wrapper(cls, value, second):
+            return value if value is None else validator(value, second)
+    else:
+        def wrapper(cls, value, second, third):
+            return value if value is None else validator(value, second, third)
+    wrapper.__name__ = wrapper.__qualname__ = getattr(validator, "__name__", "validator")
+    return wrapper
+
+def _derive_optional_model(model_cls: type[BaseModel], recursive: bool, keep_validators: bool) -> type[BaseModel]:
     new_fields = {}
-    
     for name, field in model_cls.model_fields.items():
-        field_type = annotations.get(name, field.annotation)
-        new_fields[name] = (Optional[field_type], None)
-    
+        field_type = _optional_annotation(field.annotation, recursive, keep_validators)
+        new_fields[name] = (Optional[field_type], FieldInfo.merge_field_infos(field, default=None, default_factory=None))
+
     new_name = f"Optional{model_cls.__name__}"
-    return create_model(new_name, __base__=model_cls.__base__, **new_fields)
+    if not keep_validators:
+        return create_model(new_name, __config__=model_cls.model_config, __module__=model_cls.__module__, **new_fields)
+
+    # Re-declaring a validator under the same name overrides the inherited one.
+    validators = {
+        attr: field_validator(*decorator.info.fields, mode=decorator.info.mode, check_fields=False)(_none_tolerant(decorator.func))
+        for attr, decorator in model_cls.__pydantic_decorators__.field_validators.items()
+    }
+    return create_model(new_name, __base__=model_cls, __module__=model_cls.__module__, __validators__=validators, **new_fields)
+
+if __name__ == "__main__":
+    import timeit
+    from pydantic import ConfigDict, Field, ValidationError
+
+    class Foo(BaseModel):
+        field1: str
+
+    try:
+        Foo()
+        print("this should not print")
+    except Exception as e:
+        print(f"Error creating Foo without field1: {e}")
+
+    OptionalFoo = make_all_fields_optional(Foo)
+
+    o = OptionalFoo()
+    print(f"OptionalFoo created successfully: {o}")
+
+    o2 = OptionalFoo.model_validate({})
+    print(f"OptionalFoo created with empty dict: {o2}")
+
+    # Validators and config survive, and nested models (here inside a generic) become optional too.
+    class Address(BaseModel):
+        model_config = ConfigDict(str_strip_whitespace=True)
+        city: str = Field(max_length=16)
+
+        @field_validator("city")
+        def capitalize_city(cls, value: str) -> str:
+            return value.capitalize()
 
-class Foo(BaseModel):
-    field1: str
-    
-try:
-    Foo()
-    print("this should not print")
-except Exception as e:
-    print(f"Error creating Foo without field1: {e}")
+    class Wrapper[T: BaseModel](BaseModel):
+        items: list[T]
 
-OptionalFoo = make_all_fields_optional(Foo)
+    class User(BaseModel):
+        name: str
+        addresses: Wrapper[Address]
 
-o = OptionalFoo()
-print(f"OptionalFoo created successfully: {o}")
+    OptionalUser = make_all_fields_optional(User, recursive=True)
+    patch = OptionalUser.model_validate({"addresses": {"items": [{"city": "  paris "}, {}]}})
+    print(f"Recursive patch model: {patch}")
+    try:
+        OptionalUser.model_validate({"addresses": {"items": [{"city": "x" * 20}]}})
+    except ValidationError as e:
+        print(f"Constraints kept: {e.errors()[0]['msg']}")
+    assert make_all_fields_optional(User, recursive=True) is OptionalUser
 
-o2 = OptionalFoo.model_validate({})
-print(f"OptionalFoo created with empty dict: {o2}")
+    uncached = timeit.timeit(lambda: _derive_optional_model(User, True, True), number=20) / 20
+    cached = timeit.timeit(lambda: make_all_fields_optional(User, recursive=True), number=100_000) / 100_000
+    print(f"Deriving with create_model: {uncached * 1e3:.2f} ms/call; cached: {cached * 1e9:.0f} ns/call ({uncached / cached:,.0f}x)")
@@ -2,23 +2,40 @@ import uuid
 from pydantic import BaseModel, ValidationError, field_validator, Field, ValidationInfo
 import os
 import asyncio
+import functools
+import time
 import dotenv
 import typing as t
-from langchain_core.tools import tool
-from langchain_anthropic import ChatAnthropic
-from langgraph.prebuilt import create_react_agent
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage, messages_to_dict, messages_from_dict
 import pickle
-import json
-import instructor
-import anthropic
 import pprint
 
-from agents import Agent, Runner, function_tool, set_tracing_disabled
-from agents.extensions.models.litellm_model import LitellmModel
-
-class TestModel(BaseModel):
-    name: str = Field(description="Name of the user", max_length=32)
+from lazy_imports import lazy_import
+from conversation_store import ConversationStore
+from prompt_cache import CachedPrompt, PromptCacheUsage, report_cache_usage
+from partial_stream import PartialJsonStream, TextFieldDelta, anthropic_tool_for
+from tool_memo import memoize_validator, validation_memo_scope
+from llm_telemetry import LLMCallRecord, default_sink, install_litellm_telemetry, instrument_instructor, print_rollup, telemetry_prompt
+from history_compaction import HistoryCompactor, FACTS_KEY, validated_fields
+from field_repair import RepairableModel, Repair, collapse_whitespace, capitalize_words, repair_stats
+
+if t.TYPE_CHECKING:
+    from agents import Agent
+    from langchain_core.runnables import RunnableConfig
+
+# Each backend is imported when its code path first runs, so a CLI run only pays for the one it uses.
+instructor = lazy_import("instructor")
+anthropic = lazy_import("anthropic")
+agents = lazy_import("agents")
+litellm_model = lazy_import("agents.extensions.models.litellm_model")
+langchain_anthropic = lazy_import("langchain_anthropic")
+langchain_messages = lazy_import("langchain_core.messages")
+langchain_tools = lazy_import("langchain_core.tools")
+langgraph_prebuilt = lazy_import("langgraph.prebuilt")
+
+CONVERSATION_DB_PATH = './conversations.db'
+
+class TestModel(RepairableModel):
+    name: t.Annotated[str, Repair(collapse_whitespace, capitalize_words)] = Field(description="Name of the user", max_length=32)
 
     @field_validator("name")
     def validate_name(cls, value: str, info: ValidationInfo) -> str:
@@ -55,8 +72,22 @@ class FormResult(BaseModel):
         default=None,
         description="This field contains a prompt to be sent to the user if status is USER_INPUT_NEEDED. Otherwise it is null."
     )
+    partial_result: dict[str, t.Any] | None = Field(
+        default=None,
+        description="The form fields you could already fill in from the conversation so far, even if status is USER_INPUT_NEEDED."
+    )
+
+    def facts(self) -> dict[str, t.Any]:
+        """
+        The form fields this turn established: the fields of partial_result that validate on their
+        own, plus the whole final_result on SUCCESS.
+        """
+        facts = validated_fields(TestModel, self.partial_result or {})
+        if self.final_result:
+            facts.update(self.final_result.model_dump())
+        return facts
     
-@function_tool(strict_mode=False)
+@memoize_validator()
 def validate_model_openai(json_dict: dict[str, t.Any]) -> t.Union[TestModel, ValidationError]:
     """
     Validates a JSON dictionary against the TestModel schema using Pydantic.
@@ -78,7 +109,7 @@ def validate_model_openai(json_dict: dict[str, t.Any]) -> t.Union[TestModel, Val
     except ValidationError as e:
         return e
     
-@tool(parse_docstring=True, error_on_invalid_docstring=True)
+@memoize_validator()
 def validate_model_langgraph(
     json_dict: t.Annotated[dict[str, t.Any], "A JSON object representing raw form data to be validated."]
 ) -> t.Union[TestModel, ValidationError]:
@@ -103,7 +134,17 @@ def validate_model_langgraph(
         return e
 
 
-TOOL_BASED_PROMPT_AGENT_AGNOSTIC = f"""
+# The tool decorators are applied on first use, since they need the agents and LangChain packages.
+@functools.cache
+def openai_validation_tool():
+    return agents.function_tool(strict_mode=False)(validate_model_openai)
+
+@functools.cache
+def langgraph_validation_tool():
+    return langchain_tools.tool(parse_docstring=True, error_on_invalid_docstring=True)(validate_model_langgraph)
+
+
+TOOL_BASED_PROMPT_AGENT_AGNOSTIC = CachedPrompt("""
 You are an agent whose goal is to take unstructured user input and format it into a structured form.
 
 CRITICAL: Always review the entire conversation history before responding. Information provided in ANY previous turn must be used and should never be requested again. Before asking for any information, first check if it has already been provided in earlier messages.
@@ -134,9 +175,9 @@ Always build upon the accumulated information from the entire conversation histo
 Here is the JSON schema for the structured output:
 
 ```json
-{json.dumps(TestModel.model_json_schema(), indent=2)}
+{schema}
 ```
-"""
+""", schema_model=TestModel)
     
 async def test_with_openai_output_type():
     """
@@ -146,18 +187,19 @@ async def test_with_openai_output_type():
     It simply throws a value error. In fact it does not even seem to be able to follow length constraints
     or things that are specified statically.
     """
-    agent = Agent(
+    agent = agents.Agent(
         name="Assistant",
         instructions="""
 You are responsible for filling out a simple form. For now that form only needs a person's name.
 Ask the user questions until you are able to fill out the form to the supplied output schema,
 then return the results
         """,
-        model=LitellmModel(model="anthropic/claude-sonnet-4-20250514", api_key=os.getenv("ANTHROPIC_KEY")),
+        model=litellm_model.LitellmModel(model="anthropic/claude-sonnet-4-20250514", api_key=os.getenv("ANTHROPIC_KEY")),
         output_type=TestModel
     )
 
-    result = await Runner.run(agent, "My name is Bob Untzuntzuntzuntzuntzuntzuntzuntzuntz.")
+    install_litellm_telemetry(default_sink())
+    result = await agents.Runner.run(agent, "My name is Bob Untzuntzuntzuntzuntzuntzuntzuntzuntz.")
     print(result.final_output)
 
 async def test_with_openai_with_tool(user_input: str):
@@ -173,51 +215,94 @@ async def test_with_openai_with_tool(user_input: str):
 
     Note to above: this seems to have fixed it.
     """
-    agent = Agent(
+    print(await fill_form_with_openai_agent(user_input))
+
+@functools.cache
+def form_agent() -> "Agent":
+    return agents.Agent(
         name="Assistant",
-        instructions=TOOL_BASED_PROMPT_AGENT_AGNOSTIC,
-        model=LitellmModel(model="anthropic/claude-sonnet-4-20250514", api_key=os.getenv("ANTHROPIC_KEY")),
+        instructions=TOOL_BASED_PROMPT_AGENT_AGNOSTIC.text,
+        model=litellm_model.LitellmModel(model="anthropic/claude-sonnet-4-20250514", api_key=os.getenv("ANTHROPIC_KEY")),
         output_type=FormResult,
-        tools=[validate_model_openai]
+        tools=[openai_validation_tool()]
     )
 
-    result = await Runner.run(agent, user_input)
-    print(result.final_output)
+async def fill_form_with_openai_agent(user_input: str) -> FormResult:
+    """
+    Single-shot version of test_with_openai_with_tool, for use by batch_runner.
+    """
+    install_litellm_telemetry(default_sink())
+    # Each call is its own conversation, so its validation results are memoized for it alone.
+    with validation_memo_scope(uuid.uuid4().hex):
+        result = await agents.Runner.run(form_agent(), user_input)
+    return result.final_output
 
-async def test_with_langgraph(user_input: str, fresh_start: bool = True):
+async def stream_langgraph_form_result(react_agent, agent_input: dict, config: "RunnableConfig") -> dict[str, t.Any]:
+    """
+    Runs the react agent while printing user_prompt as the structured-response tool call streams in.
+    Returns the final graph values, exactly as ainvoke would.
+    """
+    partials = PartialJsonStream(FormResult)
+    user_prompt = TextFieldDelta("user_prompt")
+    result: dict[str, t.Any] = {}
+    async for mode, chunk in react_agent.astream(agent_input, config=config, stream_mode=["messages", "values"]):
+        if mode == "values":
+            result = chunk
+            continue
+        message, metadata = chunk
+        if metadata.get("langgraph_node") != "generate_structured_response" or not isinstance(message, langchain_messages.AIMessageChunk):
+            continue
+        for tool_call_chunk in message.tool_call_chunks:
+            if (partial := partials.feed(tool_call_chunk.get("args") or "")) is not None and (delta := user_prompt(partial)):
+                print(delta, end="", flush=True)
+    if user_prompt.seen:
+        print()
+    return result
+
+async def test_with_langgraph(user_input: str, fresh_start: bool = True, stream: bool = False):
     """
     NOTES:
     """
     print(f'input: {user_input}')
-    validate_model_langgraph.name
-    llm = ChatAnthropic(model="claude-sonnet-4-20250514", anthropic_api_key=os.getenv("ANTHROPIC_KEY"))
-    react_agent = create_react_agent(
+    from llm_telemetry import LangChainTelemetryHandler
+
+    llm = langchain_anthropic.ChatAnthropic(model="claude-sonnet-4-20250514", anthropic_api_key=os.getenv("ANTHROPIC_KEY"))
+    react_agent = langgraph_prebuilt.create_react_agent(
         model=llm,
-        tools=[validate_model_langgraph],
-        prompt=TOOL_BASED_PROMPT_AGENT_AGNOSTIC,
+        tools=[langgraph_validation_tool()],
+        prompt=TOOL_BASED_PROMPT_AGENT_AGNOSTIC.langchain_system_message(),
         response_format=FormResult,
     )
 
-    if fresh_start or not os.path.exists('./langgraph_last_state.json'):
+    store = ConversationStore(CONVERSATION_DB_PATH)
+    thread_id = None if fresh_start else store.latest_thread_id(namespace="langgraph")
+    if thread_id is None:
         messages = []
         thread_id = uuid.uuid4().hex
     else:
-        with open('./langgraph_last_v2_state.json', 'r') as f:
-            json_messages = json.load(f)
-            messages = messages_from_dict(json_messages['messages'])
-            thread_id = json_messages['thread_id']
-    messages += [HumanMessage(content=user_input)]
-
-    result = await react_agent.ainvoke({"messages": messages}, config={"configurable": {"thread_id": thread_id}})
-    with open('./langgraph_last_v2_state.json', 'w') as f:
-        json_messages = messages_to_dict(result['messages'])
-        json.dump({'messages': json_messages, 'thread_id': thread_id}, f, indent=2)
+        messages = langchain_messages.messages_from_dict(store.iter_messages(thread_id))
+    new_messages = [langchain_messages.HumanMessage(content=user_input)]
+    messages += new_messages
+
+    config: RunnableConfig = {"configurable": {"thread_id": thread_id}, "callbacks": [LangChainTelemetryHandler(default_sink())]}
+    with validation_memo_scope(thread_id):
+        if stream:
+            result = await stream_langgraph_form_result(react_agent, {"messages": messages}, config)
+        else:
+            result = await react_agent.ainvoke({"messages": messages}, config=config)
+    # Only persist what this turn added: the user's message plus everything the agent produced.
+    store.append(
+        thread_id,
+        langchain_messages.messages_to_dict(result['messages'][len(messages) - len(new_messages):]),
+        namespace="langgraph",
+    )
+    for message in result['messages'][len(messages):]:
+        if isinstance(message, langchain_messages.AIMessage):
+            report_cache_usage("langgraph", PromptCacheUsage.from_langchain(message))
+    print(f"LLM retries avoided by local repair: {repair_stats.retries_avoided}")
     print(result['structured_response'])
     
-def test_with_instructor(user_input: str, fresh_start: bool = True):
-    if fresh_start or not os.path.exists('./instructor_last_state.json'):
-        messages = [
-            {"role": "system", "content": """
+INSTRUCTOR_SYSTEM_PROMPT = CachedPrompt("""
 Based on the user's input, return the filled out TestModel. If you cannot or the TestModel fails validation,
 tell the user why you cannot in a UserPrompt message.
 
@@ -247,41 +332,148 @@ CRITICAL CONVERSATION HISTORY RULES:
    - Then specify ONLY what cannot be derived: "I still need: [truly missing piece]"
 
 Remember: Users expect you to make obvious connections between related information across turns.
-             """}
+""")
+
+HISTORY_COMPACTOR = HistoryCompactor(TestModel, token_budget=8000, keep_recent_messages=6)
+
+def stream_form_result(messages: list[dict[str, t.Any]]) -> t.Iterator[BaseModel]:
+    """
+    Streams a FormResult tool call straight from Anthropic, yielding partial FormResults as the
+    tool-call JSON arrives and then the fully validated FormResult. Unlike the instructor path there
+    are no automatic retries, so the final validation may raise.
+    """
+    client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_KEY"), timeout=60)
+    system = [block for m in messages if m["role"] == "system" for block in m["content"]]
+    partials = PartialJsonStream(FormResult)
+    started_at, started, first_token = time.time(), time.perf_counter(), None
+    with client.messages.stream(
+        system=system,
+        messages=[m for m in messages if m["role"] != "system"],
+        tools=[anthropic_tool_for(FormResult)],
+        tool_choice={"type": "tool", "name": FormResult.__name__},
+        max_tokens=60000,
+        temperature=0.2,
+        model="claude-sonnet-4-20250514"
+    ) as stream:
+        for event in stream:
+            if first_token is None and event.type in ("text", "input_json"):
+                first_token = time.perf_counter()
+            if event.type == "input_json" and (partial := partials.feed(event.partial_json)) is not None:
+                yield partial
+        final_message = stream.get_final_message()
+        usage = PromptCacheUsage.from_anthropic(final_message.usage)
+        report_cache_usage("stream", usage)
+        default_sink().write(LLMCallRecord(
+            started_at=started_at,
+            framework="anthropic",
+            model=final_message.model,
+            latency_seconds=time.perf_counter() - started,
+            time_to_first_token_seconds=None if first_token is None else first_token - started,
+            usage=usage,
+        ))
+    yield partials.final()
+
+def print_streamed_form_result(results: t.Iterable[BaseModel]) -> FormResult | None:
+    """
+    Prints user_prompt text as soon as it starts streaming and returns the final FormResult.
+    """
+    user_prompt = TextFieldDelta("user_prompt")
+    final = None
+    for result in results:
+        if isinstance(result, FormResult):
+            final = result
+        elif delta := user_prompt(result):
+            print(delta, end="", flush=True)
+    if user_prompt.seen:
+        print()
+    return final
+
+def test_with_instructor(user_input: str, fresh_start: bool = True, stream: bool = False):
+    store = ConversationStore(CONVERSATION_DB_PATH)
+    thread_id = None if fresh_start else store.latest_thread_id(namespace="instructor")
+    if thread_id is None:
+        thread_id = uuid.uuid4().hex
+        messages = [
+            {"role": "system", "content": INSTRUCTOR_SYSTEM_PROMPT.anthropic_system_blocks()}
         ]
     else:
-        with open('./instructor_last_state.json', 'r') as f:
-            messages = json.load(f)
+        messages = store.load(thread_id)
+    persisted_count = store.message_count(thread_id)
     messages.append({"role": "user", "content": user_input})
 
-    pprint.pprint(messages)
-    client = instructor.from_anthropic(anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_KEY"), timeout=60), mode=instructor.Mode.ANTHROPIC_REASONING_TOOLS)
-    response = client.chat.completions.create(
+    # The full history stays in the store; only a budgeted view of it is sent.
+    prompt_messages = HISTORY_COMPACTOR.compact(messages)
+    pprint.pprint(prompt_messages)
+    response = None
+    if stream:
+        try:
+            response = print_streamed_form_result(stream_form_result(prompt_messages))
+        except ValidationError as e:
+            print(f"Streamed result failed validation, retrying without streaming: {e}")
+    if response is None:
+        client = instrument_instructor(
+            instructor.from_anthropic(anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_KEY"), timeout=60), mode=instructor.Mode.ANTHROPIC_REASONING_TOOLS),
+            default_sink(),
+        )
+        response, completion = client.chat.completions.create_with_completion(
+            response_model=FormResult,
+            messages=prompt_messages,
+            max_retries=3,
+            max_tokens=60000,
+            temperature=0.2,
+            model="claude-sonnet-4-20250514"
+        )
+        report_cache_usage("instructor", PromptCacheUsage.from_anthropic(completion.usage))
+    print(response)
+    print(f"LLM retries avoided by local repair: {repair_stats.retries_avoided}")
+    
+    # Every assistant turn records its facts, so compact() can fold older turns without losing them.
+    content = response.user_prompt or (response.final_result.model_dump_json() if response.final_result else None)
+    if content:
+        assistant_message = {"role": "assistant", "content": content}
+        if facts := response.facts():
+            assistant_message[FACTS_KEY] = facts
+        messages.append(assistant_message)
+
+    store.append(thread_id, messages[persisted_count:], namespace="instructor")
+
+@functools.cache
+def async_instructor_client() -> "instructor.AsyncInstructor":
+    return instrument_instructor(
+        instructor.from_anthropic(anthropic.AsyncAnthropic(api_key=os.getenv("ANTHROPIC_KEY"), timeout=60), mode=instructor.Mode.ANTHROPIC_REASONING_TOOLS),
+        default_sink(),
+    )
+
+async def fill_form_with_instructor(user_input: str) -> FormResult:
+    """
+    Single-shot, async version of test_with_instructor, for use by batch_runner.
+    The client is shared so concurrent calls reuse one connection pool.
+    """
+    return await async_instructor_client().chat.completions.create(
         response_model=FormResult,
-        messages=messages,
+        messages=[
+            {"role": "system", "content": INSTRUCTOR_SYSTEM_PROMPT.anthropic_system_blocks()},
+            {"role": "user", "content": user_input},
+        ],
         max_retries=3,
         max_tokens=60000,
         temperature=0.2,
         model="claude-sonnet-4-20250514"
     )
-    print(response)
-    
-    if response.user_prompt:
-        messages.append({"role": "assistant", "content": response.user_prompt})
-    
-    with open('./instructor_last_state.json', 'w') as f:
-        json.dump(messages, f, indent=2)
 
 if __name__ == "__main__":
     import argparse
 
     dotenv.load_dotenv()
-    set_tracing_disabled(False)
 
     parser = argparse.ArgumentParser()
     parser.add_argument("--continue", "-c", dest="continue_flag", action='store_true', help="Whether to continue from the last state (if available)")
+    parser.add_argument("--stream", "-s", action='store_true', help="Stream the response, showing the user prompt as it is generated")
     parser.add_argument('prompt', nargs='*', help='The prompt')
     args = parser.parse_args()
 
-    # asyncio.run(test_with_langgraph(' '.join(args.prompt), fresh_start=not args.continue_flag))
-    test_with_instructor(' '.join(args.prompt), fresh_start=not args.continue_flag)
+    started_at = time.time()
+    with telemetry_prompt("form_filling"):
+        # asyncio.run(test_with_langgraph(' '.join(args.prompt), fresh_start=not args.continue_flag, stream=args.stream))
+        test_with_instructor(' '.join(args.prompt), fresh_start=not args.continue_flag, stream=args.stream)
+    print_rollup(default_sink(), since=started_at)
@@ -3,25 +3,35 @@ from __future__ import annotations
 import asyncio
 import dotenv
 import os
+import time
 
-from agents import Agent, Runner, function_tool, set_tracing_disabled
-from agents.extensions.models.litellm_model import LitellmModel
+from lazy_imports import lazy_import
+from llm_telemetry import default_sink, install_litellm_telemetry, print_rollup, telemetry_prompt
+
+# Deferred so that argument errors and --help do not wait for LiteLLM to import.
+agents = lazy_import("agents")
+litellm_model = lazy_import("agents.extensions.models.litellm_model")
+hedged_model = lazy_import("hedged_model")
 
-@function_tool
 def get_weather(city: str):
     print(f"[debug] getting weather for {city}")
     return f"The weather in {city} is sunny."
 
 
-async def main(model: str, api_key: str):
-    agent = Agent(
+async def main(model: str, api_key: str, fallback_model: str | None = None):
+    llm = litellm_model.LitellmModel(model=model, api_key=api_key)
+    if fallback_model:
+        llm = hedged_model.HedgedLitellmModel([llm, litellm_model.LitellmModel(model=fallback_model, api_key=api_key)])
+    agent = agents.Agent(
         name="Assistant",
         instructions="You only respond in haikus.",
-        model=LitellmModel(model=model, api_key=api_key),
-        tools=[get_weather],
+        model=llm,
+        tools=[agents.function_tool(get_weather)],
     )
 
-    result = await Runner.run(agent, "What's the weather in Tokyo?")
+    install_litellm_telemetry(default_sink())
+    with telemetry_prompt("haiku_weather"):
+        result = await agents.Runner.run(agent, "What's the weather in Tokyo?")
     print(result.final_output)
 
 
@@ -30,11 +40,11 @@ if __name__ == "__main__":
     import argparse
 
     dotenv.load_dotenv()
-    set_tracing_disabled(True)
 
     parser = argparse.ArgumentParser()
     parser.add_argument("--model", type=str, required=False)
     parser.add_argument("--api-key", type=str, required=False)
+    parser.add_argument("--fallback-model", type=str, required=False, help="Hedge slow requests to this model")
     args = parser.parse_args()
 
     model = args.model
@@ -46,4 +56,7 @@ if __name__ == "__main__":
         if not (api_key := os.getenv("ANTHROPIC_KEY")):
             raise RuntimeError("Anthropic API key not set")
 
-    asyncio.run(main(model, api_key))
\ No newline at end of file
+    agents.set_tracing_disabled(True)
+    started_at = time.time()
+    asyncio.run(main(model, api_key, args.fallback_model))
+    print_rollup(default_sink(), since=started_at)
\ No newline at end of file
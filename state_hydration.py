@@ -0,0 +1,113 @@
+import functools
+import typing as t
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+
+@functools.cache
+def list_adapter[M: BaseModel](model_cls: type[M]) -> TypeAdapter[list[M]]:
+    return TypeAdapter(list[model_cls])  # type: ignore[valid-type]
+
+
+class HydrationError(ValueError):
+    """
+    Raised when some values fail validation. `errors` maps each failing owner to its Pydantic errors,
+    with locations relative to that owner's value.
+    """
+
+    def __init__(self, errors: dict[t.Hashable, list[dict[str, t.Any]]]):
+        self.errors = errors
+        owners = ", ".join(repr(owner) for owner in list(errors)[:5])
+        super().__init__(f"{len(errors)} value(s) failed validation: {owners}{', ...' if len(errors) > 5 else ''}")
+
+
+def hydrate[K: t.Hashable](values: t.Mapping[K, tuple[type[BaseModel], t.Any]]) -> dict[K, BaseModel]:
+    """
+    Validates many raw values (dicts of channel values, say) into their models, in one
+    `TypeAdapter(list[Model])` call per model instead of one `model_validate` call per value.
+    `values` maps each owner, such as a thread id or (thread id, checkpoint ns), to its target model
+    and raw value; the result maps the same owners to the instances.
+
+    What a list adapter saves is the per-call overhead of model_validate, which matters when a
+    batch is one model with cheap fields (see hydrate_list). When it mixes models, or validation
+    itself dominates, grouping and reordering cost about as much as they save, so expect little
+    or no gain.
+    """
+    groups: dict[type[BaseModel], tuple[list[K], list[t.Any]]] = {}
+    for owner, (model_cls, raw) in values.items():
+        owners, raws = groups.setdefault(model_cls, ([], []))
+        owners.append(owner)
+        raws.append(raw)
+
+    hydrated: dict[K, BaseModel] = {}
+    failed: dict[t.Hashable, list[dict[str, t.Any]]] = {}
+    for model_cls, (owners, raws) in groups.items():
+        try:
+            instances = list_adapter(model_cls).validate_python(raws)
+        except ValidationError as e:
+            # Errors are located by list index; hand them back to the owners.
+            for error in e.errors():
+                index, *loc = error["loc"]
+                failed.setdefault(owners[index], []).append({**error, "loc": tuple(loc)})
+            continue
+        hydrated.update(zip(owners, instances))
+    if failed:
+        raise HydrationError(failed)
+    if len(groups) == 1:
+        return hydrated
+    # Same order as the input.
+    return {owner: hydrated[owner] for owner in values}
+
+
+def hydrate_list[M: BaseModel](model_cls: type[M], raws: t.Iterable[t.Any]) -> list[M]:
+    """
+    The single-model case: `[model_cls.model_validate(raw) for raw in raws]` in one call.
+    """
+    return list_adapter(model_cls).validate_python(list(raws))
+
+
+def load_thread_states[M: BaseModel](checkpointer: t.Any, thread_ids: t.Iterable[str], model_cls: type[M], checkpoint_ns: str = "") -> dict[str, M]:
+    """
+    The latest state of each thread, read straight from the checkpointer's channel values and
+    hydrated in bulk. Threads without a checkpoint are left out.
+    """
+    fields = model_cls.model_fields.keys()
+    values: dict[str, tuple[type[BaseModel], t.Any]] = {}
+    for thread_id in thread_ids:
+        checkpoint_tuple = checkpointer.get_tuple({"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns}})
+        if checkpoint_tuple is None:
+            continue
+        channel_values = checkpoint_tuple.checkpoint["channel_values"]
+        values[thread_id] = (model_cls, {name: channel_values[name] for name in fields if name in channel_values})
+    return hydrate(values)  # type: ignore[return-value]
+
+
+if __name__ == "__main__":
+    import timeit
+
+    from langgraph_interrupt_test import OuterGraphState, SubgraphState
+
+    n = 10_000
+    outer_raw = [{"prompt": f"thread {i}", "approved": i % 2 == 0, "times_that_something_was_done": i} for i in range(n)]
+    sub_raw = [{"outer_graph_state": raw, "times_pre_step_was_run": 1} for raw in outer_raw]
+    values = {("outer", i): (OuterGraphState, raw) for i, raw in enumerate(outer_raw)}
+    values.update({("sub", i): (SubgraphState, raw) for i, raw in enumerate(sub_raw)})
+
+    states = hydrate(values)
+    assert states[("outer", 3)] == OuterGraphState.model_validate(outer_raw[3])
+    assert states[("sub", 3)] == SubgraphState.model_validate(sub_raw[3])
+
+    def one_by_one():
+        return {owner: model_cls.model_validate(raw) for owner, (model_cls, raw) in values.items()}
+
+    per_object = min(timeit.repeat(one_by_one, number=1, repeat=7))
+    bulk = min(timeit.repeat(lambda: hydrate(values), number=1, repeat=7))
+    print(f"{len(values)} states of 2 models: model_validate per object {per_object * 1e3:.1f} ms, hydrate {bulk * 1e3:.1f} ms ({per_object / bulk:.1f}x)")
+    per_object = min(timeit.repeat(lambda: [OuterGraphState.model_validate(raw) for raw in outer_raw], number=1, repeat=7))
+    bulk = min(timeit.repeat(lambda: hydrate_list(OuterGraphState, outer_raw), number=1, repeat=7))
+    print(f"{n} OuterGraphStates: model_validate per object {per_object * 1e3:.1f} ms, hydrate_list {bulk * 1e3:.1f} ms ({per_object / bulk:.1f}x)")
+
+    try:
+        hydrate({"good": (OuterGraphState, outer_raw[0]), "bad": (OuterGraphState, {"approved": "maybe"})})
+    except HydrationError as e:
+        print(e, [error["loc"] for error in e.errors["bad"]])
@@ -0,0 +1,242 @@
+import gc
+import itertools
+import sys
+import tracemalloc
+import typing as t
+
+from pydantic import BaseModel
+
+_CONTAINERS = (list, tuple, set, frozenset)
+
+
+def deep_sizeof(obj: t.Any, seen: set[int] | None = None) -> int:
+    """
+    Bytes held by `obj` and everything it references through containers and Pydantic models
+    (fields, fields set, extras and private attributes). Shared objects are counted once per `seen`.
+    """
+    seen = set() if seen is None else seen
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, _CONTAINERS):
+            stack.extend(obj)
+        elif isinstance(obj, BaseModel):
+            stack.append(obj.__dict__)
+            stack.append(obj.__pydantic_fields_set__)
+            if obj.__pydantic_extra__:
+                stack.append(obj.__pydantic_extra__)
+            if obj.__pydantic_private__:
+                stack.append(obj.__pydantic_private__)
+    return size
+
+
+def live_models() -> dict[str, int]:
+    """
+    Live Pydantic model instances by class, found by walking every object the GC tracks, leaving
+    out this module's own snapshots. Meant for profiling only.
+    """
+    # isinstance() against BaseModel goes through ABCMeta.__instancecheck__, which is far too slow
+    # for every object in the process; decide once per type instead.
+    is_model: dict[type, bool] = {}
+    counts: dict[str, int] = {}
+    for obj in gc.get_objects():
+        cls = type(obj)
+        model = is_model.get(cls)
+        if model is None:
+            model = is_model[cls] = BaseModel in cls.__mro__ and cls.__module__ != __name__
+        if model:
+            counts[cls.__qualname__] = counts.get(cls.__qualname__, 0) + 1
+    return counts
+
+
+def checkpointer_bytes(checkpointer: t.Any) -> int | None:
+    """
+    What an in-process saver (e.g. InMemorySaver) holds: checkpoints, pending writes and channel
+    blobs. None for savers that keep their data elsewhere.
+    """
+    stores = [getattr(checkpointer, name, None) for name in ("storage", "writes", "blobs")]
+    if all(store is None for store in stores):
+        return None
+    seen: set[int] = set()
+    return sum(deep_sizeof(store, seen) for store in stores if store is not None)
+
+
+class StepSnapshot(BaseModel):
+    step: int
+    namespace: str
+    channel_bytes: dict[str, int]
+    state_bytes: int
+    live_models: dict[str, int]
+    traced_bytes: int
+    checkpoint_bytes: int | None
+    top_allocators: list[tuple[str, int]]
+    """
+    Where traced memory grew since the previous snapshot, as ("file:line", bytes), largest first.
+    """
+
+
+class MemoryReport(BaseModel):
+    snapshots: list[StepSnapshot]
+    net_allocators: list[tuple[str, int]]
+    """
+    Allocation sites that hold more memory after the last superstep than after the first, largest
+    first. Unlike summing the per-step growth, this leaves out memory that is freed again.
+    """
+
+    def namespaces(self) -> list[str]:
+        return list(dict.fromkeys(snapshot.namespace for snapshot in self.snapshots))
+
+    def channel_growth(self, namespace: str = "") -> dict[str, float]:
+        """
+        Mean bytes per superstep each channel grew by in `namespace`, from its first snapshot to its
+        last, largest first.
+        """
+        first: dict[str, tuple[int, int]] = {}
+        last: dict[str, tuple[int, int]] = {}
+        for index, snapshot in enumerate(snapshot for snapshot in self.snapshots if snapshot.namespace == namespace):
+            for channel, size in snapshot.channel_bytes.items():
+                first.setdefault(channel, (index, size))
+                last[channel] = (index, size)
+        growth = {
+            channel: (last[channel][1] - size) / (last[channel][0] - index)
+            for channel, (index, size) in first.items()
+            if last[channel][0] > index
+        }
+        return dict(sorted(growth.items(), key=lambda item: item[1], reverse=True))
+
+    def _per_step(self, values: list[float]) -> float:
+        return (values[-1] - values[0]) / (len(values) - 1) if len(values) > 1 else 0.0
+
+    def model_growth(self) -> dict[str, float]:
+        """
+        Mean live instances added per superstep, by model class, for classes that grew.
+        """
+        names = {name for snapshot in self.snapshots for name in snapshot.live_models}
+        growth = {name: self._per_step([snapshot.live_models.get(name, 0) for snapshot in self.snapshots]) for name in names}
+        return dict(sorted(((name, value) for name, value in growth.items() if value > 0), key=lambda item: item[1], reverse=True))
+
+    def traced_growth(self) -> float:
+        return self._per_step([snapshot.traced_bytes for snapshot in self.snapshots])
+
+    def checkpoint_growth(self) -> float | None:
+        sizes = [snapshot.checkpoint_bytes for snapshot in self.snapshots if snapshot.checkpoint_bytes is not None]
+        return self._per_step(sizes) if sizes else None  # type: ignore[arg-type]
+
+    def print(self, top: int = 5) -> None:
+        print(f"{len(self.snapshots)} supersteps; traced memory {self.traced_growth():+.0f} B/step", end="")
+        checkpoint_growth = self.checkpoint_growth()
+        print("" if checkpoint_growth is None else f", checkpointer {checkpoint_growth:+.0f} B/step")
+        for namespace in self.namespaces():
+            growth = {channel: value for channel, value in self.channel_growth(namespace).items() if value}
+            print(f"  channels in {namespace or 'root graph'}: " + (", ".join(f"{channel} {value:+.0f} B/step" for channel, value in list(growth.items())[:top]) or "no growth"))
+        model_growth = list(self.model_growth().items())[:top]
+        print("  live models: " + (", ".join(f"{name} {value:+.2f}/step" for name, value in model_growth) or "no growth"))
+        for location, size in self.net_allocators[:top]:
+            print(f"  {size / 1024:+8.1f} KiB  {location}")
+
+
+def profile_state_memory(
+    app: t.Any,
+    input: t.Any,
+    config: t.Any = None,
+    top: int = 10,
+    count_models: bool = True,
+) -> MemoryReport:
+    """
+    Runs the graph to completion (or its next interrupt) and snapshots memory after every
+    superstep of the graph and its subgraphs: the deep size of each channel, live Pydantic models,
+    tracemalloc's traced total and top growing allocation sites, and what the checkpointer holds.
+    """
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    # The profiler's own allocations; filtered from the compared stats, since filter_traces() costs
+    # more than the snapshot itself.
+    own_files = {tracemalloc.__file__, __file__}
+    # Plain dicts until the end: StepSnapshot instances would be allocated in pydantic, not here.
+    snapshots: list[dict[str, t.Any]] = []
+    steps: dict[str, int] = {}
+
+    def growth(current: tracemalloc.Snapshot, previous: tracemalloc.Snapshot) -> list[tuple[str, int]]:
+        stats = (stat for stat in current.compare_to(previous, "lineno") if stat.size_diff > 0 and stat.traceback[0].filename not in own_files)
+        return [(f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", stat.size_diff) for stat in itertools.islice(stats, top)]
+
+    previous = tracemalloc.take_snapshot()
+    first: tracemalloc.Snapshot | None = None
+    try:
+        for namespace, values in app.stream(input, config, stream_mode="values", subgraphs=True):
+            namespace = "|".join(part.split(":")[0] for part in namespace)
+            steps[namespace] = steps.get(namespace, 0) + 1
+            values = values if isinstance(values, dict) else {"__root__": values}
+            seen: set[int] = set()
+            state_bytes = 0
+            channel_bytes = {}
+            for channel, value in values.items():
+                channel_bytes[channel] = deep_sizeof(value)
+                state_bytes += deep_sizeof(value, seen)
+            current = tracemalloc.take_snapshot()
+            first = first or current
+            top_allocators = growth(current, previous)
+            previous = current
+            snapshots.append({
+                "step": steps[namespace],
+                "namespace": namespace,
+                "channel_bytes": channel_bytes,
+                "state_bytes": state_bytes,
+                "live_models": live_models() if count_models else {},
+                "traced_bytes": tracemalloc.get_traced_memory()[0],
+                "checkpoint_bytes": checkpointer_bytes(getattr(app, "checkpointer", None)),
+                "top_allocators": top_allocators,
+            })
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+    return MemoryReport.model_validate({"snapshots": snapshots, "net_allocators": growth(previous, first) if first else []})
+
+
+if __name__ == "__main__":
+    import operator
+
+    from langgraph.checkpoint.memory import InMemorySaver
+    from langgraph.graph import END, StateGraph
+
+    from graph_bench import cycle
+    from langgraph_interrupt_test import OuterGraphState, setup_workflow_with_subgraph
+    from langgraph_quirks import Foo
+
+    # but_if_you_add_a_cycle: state stays flat, but InMemorySaver keeps every checkpoint.
+    app = cycle(30, InMemorySaver())
+    report = profile_state_memory(app, Foo(foo_field="hello"), {"configurable": {"thread_id": "cycle"}, "recursion_limit": 1_000})
+    report.print()
+
+    # conditional_cyclic_test_no_decorators_bigger, plus a history channel with an appending reducer.
+    class LoopState(t.TypedDict):
+        counter: int
+        history: t.Annotated[list[str], operator.add]
+
+    def before_loop(state: LoopState) -> dict:
+        return {"counter": 30}
+
+    def loop_node(state: LoopState) -> dict:
+        return {"counter": state["counter"] - 1, "history": [f"iteration {state['counter']}: " + "x" * 200]}
+
+    graph = StateGraph(LoopState)
+    graph.add_sequence([("before_loop", before_loop), ("loop_node", loop_node)])
+    graph.add_conditional_edges("loop_node", lambda state: "loop" if state["counter"] > 0 else "done", {"loop": "loop_node", "done": END})
+    graph.set_entry_point("before_loop")
+    report = profile_state_memory(graph.compile(), {"counter": 0, "history": []}, {"recursion_limit": 1_000})
+    report.print()
+    growth = report.channel_growth()
+    assert growth["history"] > 200 and growth["counter"] == 0
+
+    # Subgraph supersteps are reported under their own namespace.
+    app = setup_workflow_with_subgraph()
+    profile_state_memory(app, OuterGraphState(prompt="Nothing sensitive."), {"configurable": {"thread_id": "subgraph"}}).print()
@@ -0,0 +1,140 @@
+import contextlib
+import contextvars
+import functools
+import hashlib
+import json
+import threading
+import typing as t
+from collections import OrderedDict
+
+# None outside validation_memo_scope, where memoized validators just call through.
+_current_scope: contextvars.ContextVar[str | None] = contextvars.ContextVar("validation_memo_scope", default=None)
+
+
+@contextlib.contextmanager
+def validation_memo_scope(scope: str) -> t.Iterator[None]:
+    """
+    Runs the enclosed calls with memoized results scoped to `scope`, usually a conversation thread_id.
+    The scope follows asyncio tasks and the executor threads LangChain runs sync tools in. Outside
+    any scope nothing is memoized, so unrelated conversations never share results.
+    """
+    token = _current_scope.set(scope)
+    try:
+        yield
+    finally:
+        _current_scope.reset(token)
+
+
+def canonical_hash(value: t.Any) -> str:
+    """
+    Hash of a JSON-like value that does not depend on key order or whitespace.
+    """
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=repr)
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
+class ValidatorMemo:
+    """
+    Bounded LRU of validator results, kept separately per scope.
+
+    Both results and returned errors are cached, so the caller gets back exactly the object it
+    would have gotten from the validator and the tool message it renders is unchanged.
+    """
+
+    def __init__(self, maxsize: int = 256, max_scopes: int = 1024):
+        self.maxsize = maxsize
+        self.max_scopes = max_scopes
+        self._scopes: OrderedDict[str, OrderedDict[str, t.Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _scope(self, scope: str) -> OrderedDict[str, t.Any]:
+        entries = self._scopes.get(scope)
+        if entries is None:
+            entries = self._scopes[scope] = OrderedDict()
+            if len(self._scopes) > self.max_scopes:
+                self._scopes.popitem(last=False)
+        else:
+            self._scopes.move_to_end(scope)
+        return entries
+
+    def get(self, scope: str, key: str) -> tuple[bool, t.Any]:
+        with self._lock:
+            entries = self._scope(scope)
+            if key in entries:
+                entries.move_to_end(key)
+                self.hits += 1
+                return True, entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, scope: str, key: str, value: t.Any) -> None:
+        with self._lock:
+            entries = self._scope(scope)
+            entries[key] = value
+            entries.move_to_end(key)
+            if len(entries) > self.maxsize:
+                entries.popitem(last=False)
+
+    def clear(self, scope: str | None = None) -> None:
+        with self._lock:
+            if scope is None:
+                self._scopes.clear()
+            else:
+                self._scopes.pop(scope, None)
+
+    def __repr__(self) -> str:
+        return f"ValidatorMemo(hits={self.hits}, misses={self.misses}, scopes={len(self._scopes)})"
+
+
+def memoize_validator[**P, R](maxsize: int = 256) -> t.Callable[[t.Callable[P, R]], t.Callable[P, R]]:
+    """
+    Memoizes a validator tool on a canonical hash of its arguments. Apply it underneath the
+    framework's tool decorator (@function_tool, @tool) so the tool's signature and docstring are
+    still read from the original function. Results are only memoized inside a
+    validation_memo_scope. The memo is exposed as `wrapper.memo`.
+    """
+    def decorator(func: t.Callable[P, R]) -> t.Callable[P, R]:
+        memo = ValidatorMemo(maxsize=maxsize)
+
+        @functools.wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            scope = _current_scope.get()
+            if scope is None:
+                return func(*args, **kwargs)
+            key = canonical_hash([args, kwargs])
+            hit, value = memo.get(scope, key)
+            if hit:
+                return value
+            value = func(*args, **kwargs)
+            memo.put(scope, key, value)
+            return value
+
+        wrapper.memo = memo  # type: ignore[attr-defined]
+        return wrapper
+    return decorator
+
+
+if __name__ == "__main__":
+    from pydantic import BaseModel, ValidationError
+
+    class Person(BaseModel):
+        name: str
+
+    @memoize_validator(maxsize=2)
+    def validate_person(json_dict: dict[str, t.Any]) -> Person | ValidationError:
+        print(f"validating: {json_dict}")
+        try:
+            return Person.model_validate(json_dict)
+        except ValidationError as e:
+            return e
+
+    with validation_memo_scope("thread_1"):
+        first = validate_person({"name": 42})
+        again = validate_person({"name": 42})
+        assert first is again
+    with validation_memo_scope("thread_2"):
+        validate_person({"name": 42})
+    assert validate_person({"name": 42}) is not validate_person({"name": 42})
+    print(validate_person.memo)